@@ -0,0 +1,131 @@
+import sys
+import math
+import logging
+import argparse
+import statistics
+from benchmark import confidence_interval
+from utils import setup_logging
+
+# Candidate growth models; each series is fitted through the origin as
+# y = b * f(n). A free intercept lets n and n log n trade places over the
+# usual one-decade size grids and can go negative.
+MODELS = {
+    'n': lambda n: n,
+    'n log n': lambda n: n * math.log2(n),
+    'n^2': lambda n: n * n,
+}
+DRIFT_THRESHOLD = 0.25
+REGRESSION_TOLERANCE = 0.10
+
+def fit_model(model, sizes, values):
+    # Least squares on the relative residuals (y - b * f(n)) / y, since
+    # timing noise is proportional to the value; values must be positive
+    ratios = [MODELS[model](n) / y for n, y in zip(sizes, values)]
+    b = sum(ratios) / sum(r * r for r in ratios)
+    predicted = [b * MODELS[model](n) for n in sizes]
+    error = math.sqrt(statistics.mean(((y - p) / y) ** 2 for y, p in zip(values, predicted)))
+    y_mean = statistics.mean(values)
+    ss_res = sum((y - p) ** 2 for y, p in zip(values, predicted))
+    ss_tot = sum((y - y_mean) ** 2 for y in values)
+    r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0
+    return {'model': model, 'b': b, 'error': error, 'r2': r2, 'predicted': predicted}
+
+def best_fit(sizes, values):
+    # Smallest relative error among the models
+    if len(sizes) < 3 or min(values) <= 0:
+        return None
+    fits = [fit_model(model, sizes, values) for model in MODELS]
+    return min(fits, key=lambda fit: fit['error'])
+
+def drifting_cells(fit, sizes, values, threshold=DRIFT_THRESHOLD):
+    drifts = []
+    for size, value, predicted in zip(sizes, values, fit['predicted']):
+        if predicted > 0 and abs(value - predicted) / predicted > threshold:
+            drifts.append((size, value, predicted))
+    return drifts
+
+def series(experiment, algo_name, order, small, metric='time'):
+    sizes = []
+    values = []
+    for size in (experiment.small_sizes if small else experiment.large_sizes):
+        key = f"{order}_{size}_small" if small else f"{order}_{size}"
+        cell = experiment.results.get(algo_name, {}).get(key)
+        # Cells without a positive mean cannot be fitted on a relative scale
+        if cell and cell.get(metric) and statistics.mean(cell[metric]) > 0:
+            sizes.append(size)
+            values.append(statistics.mean(cell[metric]))
+    return sizes, values
+
+def fit_results(experiment, metric='time', threshold=DRIFT_THRESHOLD):
+    fits = []
+    for algo_name in experiment.results:
+        for order in experiment.orders:
+            for small in [False, True]:
+                sizes, values = series(experiment, algo_name, order, small, metric)
+                fit = best_fit(sizes, values)
+                if fit is None:
+                    continue
+                fit.update({'algorithm': algo_name, 'order': order, 'small': small,
+                            'drifts': drifting_cells(fit, sizes, values, threshold)})
+                fits.append(fit)
+    return fits
+
+def log_complexity_fits(experiment, metric='time', threshold=DRIFT_THRESHOLD):
+    fits = fit_results(experiment, metric, threshold)
+    logging.info(f"\nComplexity Fits ({metric}, y = b * f(n)):")
+    logging.info(f"{'Algorithm':<45} {'Order':<18} {'Lists':<7} {'Model':<9} {'b':<12} {'Rel. error':<12} {'R^2':<8} {'Drifting cells':<15}")
+    for fit in fits:
+        drifts = ', '.join(f"{size} ({value / predicted - 1:+.0%})" for size, value, predicted in fit['drifts'])
+        logging.info(f"{fit['algorithm']:<45} {fit['order'].capitalize():<18} {'small' if fit['small'] else 'large':<7} "
+                     f"{fit['model']:<9} {fit['b']:<12.4g} {fit['error']:<12.2%} {fit['r2']:<8.4f} {drifts or '-':<15}")
+    return fits
+
+def compare(current, baseline, metric='time', tolerance=REGRESSION_TOLERANCE, confidence=0.95):
+    # A cell regresses when its mean is more than `tolerance` above the
+    # baseline mean and the two confidence intervals do not overlap, so
+    # noisy cells need a clear separation before they fail the check
+    regressions = []
+    for algo_name, cells in current.results.items():
+        for key, cell in cells.items():
+            base = baseline.results.get(algo_name, {}).get(key)
+            if not base or not cell.get(metric) or not base.get(metric):
+                continue
+            mean = statistics.mean(cell[metric])
+            base_mean = statistics.mean(base[metric])
+            if base_mean <= 0 or mean <= base_mean * (1 + tolerance):
+                continue
+            low, _ = confidence_interval(cell[metric], confidence)
+            _, base_high = confidence_interval(base[metric], confidence)
+            if low > base_high:
+                regressions.append((algo_name, key, base_mean, mean))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit complexity models to stored results and check for regressions")
+    parser.add_argument('store', nargs='?', default='results.jsonl', help="JSON Lines result store")
+    parser.add_argument('--baseline', help="result store of a baseline run to compare against")
+    parser.add_argument('--metric', default='time', help="metric to fit and compare (default: time)")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help="relative slowdown tolerated before a cell counts as a regression")
+    parser.add_argument('--drift', type=float, default=DRIFT_THRESHOLD,
+                        help="relative distance from the fitted curve that flags a cell")
+    parser.add_argument('--fail-on-drift', action='store_true', help="also exit nonzero when a cell drifts")
+    args = parser.parse_args(argv)
+    setup_logging()
+    # report imports plotting, which main.py only loads when figures are requested
+    from report import StoredResults
+    current = StoredResults(args.store)
+    fits = log_complexity_fits(current, args.metric, args.drift)
+    failed = args.fail_on_drift and any(fit['drifts'] for fit in fits)
+    if args.baseline:
+        regressions = compare(current, StoredResults(args.baseline), args.metric, args.tolerance)
+        logging.info(f"\nRegressions against {args.baseline} ({args.metric}, tolerance {args.tolerance:.0%}):")
+        for algo_name, key, base_mean, mean in regressions:
+            logging.info(f"{algo_name:<45} {key:<25} {base_mean:<12.4g} -> {mean:<12.4g} ({mean / base_mean - 1:+.0%})")
+        if not regressions:
+            logging.info("None")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
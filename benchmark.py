@@ -0,0 +1,161 @@
+import gc
+import math
+import time
+import random
+import statistics
+from functools import lru_cache
+
+class BenchmarkPolicy:
+    # Repetitions run until the confidence interval half-width is within
+    # target_rel_error of the mean, bounded by min/max_repetitions and by a
+    # time budget per cell. min_repetitions == max_repetitions gives a fixed
+    # repetition count.
+    def __init__(self, warmup=2, min_repetitions=5, max_repetitions=500, target_rel_error=0.02,
+                 max_seconds=2.0, confidence=0.95, interval='t', outlier_threshold=3.5):
+        if interval not in ('t', 'bootstrap'):
+            raise ValueError(f"Unknown interval method: {interval}")
+        self.warmup = warmup
+        self.min_repetitions = min_repetitions
+        self.max_repetitions = max(min_repetitions, max_repetitions)
+        self.target_rel_error = target_rel_error
+        self.max_seconds = max_seconds
+        self.confidence = confidence
+        self.interval = interval
+        self.outlier_threshold = outlier_threshold
+
+    @classmethod
+    def fixed(cls, repetitions, warmup=0):
+        return cls(warmup=warmup, min_repetitions=repetitions, max_repetitions=repetitions)
+
+    def as_dict(self):
+        return dict(vars(self))
+
+def _betacf(a, b, x):
+    # Continued fraction for the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+def _betainc(a, b, x):
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def student_t_cdf(t, df):
+    tail = 0.5 * _betainc(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t >= 0 else tail
+
+@lru_cache(maxsize=None)
+def t_critical(df, confidence=0.95):
+    target = 1.0 - (1.0 - confidence) / 2.0
+    low, high = 0.0, 1.0
+    while student_t_cdf(high, df) < target:
+        high *= 2.0
+    for _ in range(100):
+        mid = (low + high) / 2.0
+        if student_t_cdf(mid, df) < target:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2.0
+
+def bootstrap_interval(data, confidence=0.95, resamples=2000, seed=0):
+    rng = random.Random(seed)
+    n = len(data)
+    means = sorted(sum(rng.choices(data, k=n)) / n for _ in range(resamples))
+    alpha = (1.0 - confidence) / 2.0
+    return means[int(alpha * (resamples - 1))], means[int((1.0 - alpha) * (resamples - 1))]
+
+def confidence_interval(data, confidence=0.95, method='t'):
+    n = len(data)
+    if n == 0:
+        return 0.0, 0.0
+    if n == 1:
+        return data[0], data[0]
+    if method == 'bootstrap':
+        return bootstrap_interval(data, confidence)
+    mean = statistics.mean(data)
+    margin = t_critical(n - 1, confidence) * statistics.stdev(data) / math.sqrt(n)
+    return mean - margin, mean + margin
+
+def reject_outliers(data, threshold=3.5):
+    # Modified z-score on the median absolute deviation (Iglewicz & Hoaglin)
+    if len(data) < 3:
+        return list(data), 0
+    median = statistics.median(data)
+    mad = statistics.median(abs(x - median) for x in data)
+    if mad == 0:
+        return list(data), 0
+    kept = [x for x in data if abs(0.6745 * (x - median) / mad) <= threshold]
+    return kept, len(data) - len(kept)
+
+def measure(func, make_input, policy, check=None):
+    # Times func(make_input()) in milliseconds. The input is built before the
+    # clock starts, the collector is off while the clock runs, and check (if
+    # given) sees every output after the clock has stopped. The stopping rule
+    # always uses the t interval; a bootstrap per repetition would cost more
+    # than the small cells it is meant to measure.
+    for _ in range(policy.warmup):
+        func(make_input())
+    samples = []
+    kept = []
+    outliers = 0
+    output = None
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    deadline = time.perf_counter() + policy.max_seconds
+    try:
+        while len(samples) < policy.max_repetitions:
+            arr = make_input()
+            gc.disable()
+            start_time = time.perf_counter()
+            output = func(arr)
+            end_time = time.perf_counter()
+            if gc_was_enabled:
+                gc.enable()
+            samples.append((end_time - start_time) * 1000)
+            if check is not None:
+                check(output)
+            if len(samples) < policy.min_repetitions:
+                continue
+            kept, outliers = reject_outliers(samples, policy.outlier_threshold)
+            low, high = confidence_interval(kept, policy.confidence)
+            mean = statistics.mean(kept)
+            if mean > 0 and (high - low) / 2 <= policy.target_rel_error * mean:
+                break
+            if end_time >= deadline:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if len(samples) < policy.min_repetitions or not kept:
+        kept, outliers = reject_outliers(samples, policy.outlier_threshold)
+    return kept, {'repetitions': len(samples), 'outliers': outliers, 'warmup': policy.warmup}, output
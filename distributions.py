@@ -0,0 +1,87 @@
+import string
+from itertools import accumulate
+from functools import partial
+
+# Input distribution name -> generator(size, rng) returning a list. The names
+# are the "orders" of an experiment; parameterized variants are registered
+# under their own name with register_distribution.
+
+def random_order(size, rng):
+    data = list(range(size))
+    rng.shuffle(data)
+    return data
+
+def ascending(size, rng):
+    return list(range(size))
+
+def descending(size, rng):
+    return list(range(size - 1, -1, -1))
+
+def k_sorted(size, rng, k=10):
+    # Element i gets key i + [0, k), so it ends up fewer than k positions from its sorted place
+    return sorted(range(size), key=lambda i: i + rng.random() * k)
+
+def percent_shuffled(size, rng, percent=5):
+    data = list(range(size))
+    positions = rng.sample(range(size), round(size * percent / 100))
+    values = [data[i] for i in positions]
+    rng.shuffle(values)
+    for i, value in zip(positions, values):
+        data[i] = value
+    return data
+
+def few_unique(size, rng, unique=10):
+    return [rng.randrange(unique) for _ in range(size)]
+
+def zipf(size, rng, s=1.1):
+    # Value r (0-based rank) is drawn with weight 1 / (r + 1) ** s
+    if size == 0:
+        return []
+    cum_weights = list(accumulate(1 / (rank + 1) ** s for rank in range(size)))
+    return rng.choices(range(size), cum_weights=cum_weights, k=size)
+
+def sawtooth(size, rng, teeth=8):
+    period = max(1, size // teeth)
+    return [i % period for i in range(size)]
+
+def organ_pipe(size, rng):
+    half = (size + 1) // 2
+    return list(range(half)) + list(range(size - half - 1, -1, -1))
+
+def random_floats(size, rng):
+    return [rng.random() for _ in range(size)]
+
+def random_strings(size, rng, length=8):
+    return [''.join(rng.choices(string.ascii_lowercase, k=length)) for _ in range(size)]
+
+DISTRIBUTIONS = {
+    'random': random_order,
+    'ascending': ascending,
+    'descending': descending,
+    'k-sorted': k_sorted,
+    'percent-shuffled': percent_shuffled,
+    'few-unique': few_unique,
+    'zipf': zipf,
+    'sawtooth': sawtooth,
+    'organ-pipe': organ_pipe,
+    'floats': random_floats,
+    'strings': random_strings,
+}
+
+# Element type of each distribution; anything not listed produces ints
+KEY_TYPES = {
+    'floats': float,
+    'strings': str,
+}
+
+def register_distribution(name, generator, key_type=int, **params):
+    DISTRIBUTIONS[name] = partial(generator, **params) if params else generator
+    KEY_TYPES[name] = key_type
+
+def key_type(order):
+    return KEY_TYPES.get(order, int)
+
+def generate(order, size, rng):
+    if order not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {order}")
+    return DISTRIBUTIONS[order](size, rng)
@@ -1,151 +1,637 @@
 import random
-import time
 import logging
 import statistics
-import math
-from sorting_algorithms import InsertionSort, QuickSort, MergeSort
+import os
+import zlib
+import tempfile
+import multiprocessing
+from copy import copy
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sorting_algorithms import (ALGORITHMS, COUNTERS, CUTOFF_CONFIG, HybridQuickSort, HybridMergeSort, IntegerSort,
+                                ParallelMergeSort, SampleSort, save_cutoffs)
+from representations import REPRESENTATIONS, convert, bytes_per_element
+from results_store import ResultStore, algorithm_version
+from benchmark import BenchmarkPolicy, confidence_interval, measure
+from instrumentation import METRICS, instrument
+from external_sort import FILE_ORDERS, ExternalMergeSort, generate_file, verify_file
+from streaming import resort_batches, stream_batches
+from distributions import DISTRIBUTIONS, generate, key_type
 
-class SortingExperiment:
-    def __init__(self):
-        self.algorithms = [InsertionSort(), QuickSort(), MergeSort()]
-        self.large_sizes = list(range(1000, 10001, 1000))
-        self.small_sizes = list(range(10, 101, 10))
-        self.orders = ['random', 'ascending', 'descending']
-        self.results = {algo.name: {} for algo in self.algorithms}
-        self.colors = {
-            'Insertion Sort': '#1f77b4',
-            'Quick Sort': '#ff7f0e',
-            'Merge Sort': '#2ca02c'
-        }
-        self.line_styles = {
-            'random': '-',
-            'ascending': '--',
-            'descending': ':'
-        }
-
-    def generate_data(self, size, order):
-        data = list(range(size))
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WorkUnit = namedtuple('WorkUnit', ['algo', 'size', 'order', 'small', 'seed', 'policy', 'options'])
+
+COLORS = {
+    'Insertion Sort': '#1f77b4',
+    'Quick Sort': '#ff7f0e',
+    'Merge Sort': '#2ca02c',
+    'Iterative Quick Sort': '#d62728',
+    'Bottom-Up Merge Sort': '#9467bd',
+    'Buffered Merge Sort': '#8c564b',
+    'Hybrid Quick Sort': '#e377c2',
+    'Hybrid Merge Sort': '#7f7f7f',
+    'Tim Sort': '#bcbd22',
+    'Built-in sorted': '#17becf'
+}
+
+LINE_STYLES = {
+    'random': '-',
+    'ascending': '--',
+    'descending': ':'
+}
+
+BACKENDS = ['python', 'numpy']
+VERIFY_MODES = ['full', 'sampled', 'deferred']
+VERIFY_SAMPLE = 1000
+
+def line_styles(orders):
+    # Distributions without a style of their own cycle through the styles
+    styles = list(LINE_STYLES.values()) + ['-.']
+    return {order: LINE_STYLES.get(order, styles[i % len(styles)]) for i, order in enumerate(orders)}
+
+def make_rng(seed, backend='python'):
+    if backend == 'numpy':
+        return np.random.default_rng(seed)
+    return random.Random(seed)
+
+def generate_data(size, order, rng=None, backend='python'):
+    if backend == 'numpy':
+        rng = rng if rng is not None else np.random.default_rng()
         if order == 'random':
-            random.shuffle(data)
+            data = rng.permutation(size)
         elif order == 'descending':
-            data.reverse()
-        return data
+            data = np.arange(size - 1, -1, -1)
+        elif order == 'ascending':
+            data = np.arange(size)
+        else:
+            # Other distributions are generated in Python from a seed drawn from rng
+            return generate(order, size, random.Random(int(rng.integers(2 ** 63))))
+        # The engines index element by element, which is much faster on lists
+        return data.tolist()
+    return generate(order, size, rng or random)
+
+def verify_sorted(arr, backend='python'):
+    if backend == 'numpy':
+        a = np.asarray(arr)
+        return bool(np.all(a[:-1] <= a[1:]))
+    return all(arr[i] <= arr[i + 1] for i in range(len(arr) - 1))
+
+def verify_sampled(arr, rng, sample=VERIFY_SAMPLE):
+    if len(arr) - 1 <= sample:
+        return verify_sorted(arr)
+    return all(arr[i] <= arr[i + 1] for i in (rng.randrange(len(arr) - 1) for _ in range(sample)))
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def unit_seed(base_seed, order, size, regime):
+    # crc32 instead of hash(): str hashes are salted per process. The
+    # large/small regimes are passed as False/True and hashed as 0/1.
+    if isinstance(regime, bool):
+        regime = int(regime)
+    return zlib.crc32(f"{base_seed}:{order}:{size}:{regime}".encode())
+
+def supports(algo, order):
+    return algo.key_types is None or key_type(order) in algo.key_types
+
+def _pin_worker(cpus, counter):
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+def run_unit(unit):
+    # Worker pools the engine started for the cell are shut down with it
+    try:
+        return _measure_unit(unit)
+    finally:
+        unit.algo.close()
+
+def _measure_unit(unit):
+    algo, size, order, options = unit.algo, unit.size, unit.order, unit.options
+    label = " (small)" if unit.small else ""
+    backend = options.get('backend', 'python')
+    verify = options.get('verify', 'full')
+    data = generate_data(size, order, make_rng(unit.seed, backend), backend)
+    data = convert(data, options.get('representation', 'list'))
+    sample_rng = random.Random(unit.seed)
+
+    def check(sorted_arr):
+        if verify == 'sampled':
+            ok = verify_sampled(sorted_arr, sample_rng)
+        else:
+            ok = verify_sorted(sorted_arr, backend)
+        if not ok:
+            logging.error(f"{algo.name} failed to sort {order} list of size {size}{label}")
+
+    algo.configure_for(order)
+    prepared = algo.prepare(data)
+    times, stats, timed_arr = measure(algo.sort, lambda: copy(prepared), unit.policy,
+                                      None if verify == 'deferred' else check)
+    if verify == 'deferred' and stats['repetitions']:
+        # Only the last timed output is kept and checked after the loop
+        check(timed_arr)
+    # Comparison counts are deterministic for fixed data, one counted run is enough
+    algo.reset_comparisons()
+    check(algo.sort_counting(data))
+    comparisons = [algo.comparisons] if algo.comparison_sort else []
+    result = {'time': times, 'comparisons': comparisons, 'bytes_per_element': bytes_per_element(data)}
+    result.update(stats)
+    result.update(algo.counters())
+    if options.get('instrument'):
+        result.update(instrument(algo, data))
+    return result
+
+class SortingExperiment:
+    def __init__(self, algorithms=None, workers=1, pin_cpus=False, seed=42, instrument=False, policy=None,
+                 backend='python', verify='full', representation='list', store=None, large_sizes=None,
+                 small_sizes=None, orders=None):
+        algorithms = algorithms or ['Insertion Sort', 'Quick Sort', 'Merge Sort']
+        for name in algorithms:
+            if name not in ALGORITHMS:
+                raise ValueError(f"Unknown algorithm: {name}")
+        self.algorithms = [ALGORITHMS[name]() for name in algorithms]
+        self.workers = workers
+        self.pin_cpus = pin_cpus
+        self.seed = seed
+        self.instrument = instrument
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == 'numpy' and np is None:
+            raise ImportError("The numpy backend requires numpy (pip install numpy)")
+        if verify not in VERIFY_MODES:
+            raise ValueError(f"Unknown verification mode: {verify}")
+        if representation not in REPRESENTATIONS:
+            raise ValueError(f"Unknown representation: {representation}")
+        self.backend = backend
+        self.verify = verify
+        self.representation = representation
+        self.store = ResultStore(store) if store else None
+        self.policy = policy or BenchmarkPolicy()
+        self.large_sizes = list(range(1000, 10001, 1000)) if large_sizes is None else list(large_sizes)
+        self.small_sizes = list(range(10, 101, 10)) if small_sizes is None else list(small_sizes)
+        # Sizes sorted out of core from binary files; opt-in, e.g. [10**7]
+        self.huge_sizes = []
+        self.external_algorithm = 'Quick Sort (median3, hoare, introsort)'
+        self.temp_dir = None
+        # Batch-arrival workloads, incremental merging vs re-sorting; opt-in
+        self.stream_sizes = []
+        self.batch_size = 100
+        self.stream_fanout = 4
+        # Strong/weak scaling of the parallel sorts on random input; opt-in,
+        # e.g. [1, 2, 4]. Weak scaling sorts scaling_size elements per worker.
+        self.scaling_workers = []
+        self.scaling_size = 100000
+        self.orders = ['random', 'ascending', 'descending'] if orders is None else list(orders)
+        for order in self.orders:
+            if order not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution: {order}")
+            if representation == 'array' and key_type(order) not in (int, float):
+                raise ValueError(f"The array representation only holds numbers, not {order} keys")
+        self.results = {algo.name: {} for algo in self.algorithms}
+        self.colors = dict(COLORS)
+
+    @property
+    def line_styles(self):
+        return line_styles(self.orders)
+
+    def generate_data(self, size, order, rng=None):
+        return generate_data(size, order, rng, self.backend)
 
     def verify_sorted(self, arr):
-        return all(arr[i] <= arr[i + 1] for i in range(len(arr) - 1))
-
-    def calculate_confidence_interval(self, data, confidence=0.95):
-        n = len(data)
-        if n < 2:
-            return 0.0, 0.0
-        mean = statistics.mean(data)
-        stdev = statistics.stdev(data)
-        t_value = 2.262  
-        margin = t_value * stdev / math.sqrt(n)
-        return mean - margin, mean + margin
+        return verify_sorted(arr, self.backend)
+
+    def unit_options(self):
+        return {'instrument': self.instrument, 'backend': self.backend, 'verify': self.verify,
+                'representation': self.representation}
+
+    def calculate_confidence_interval(self, data, confidence=None):
+        return confidence_interval(data, confidence or self.policy.confidence, self.policy.interval)
+
+    def regimes(self):
+        return [(self.large_sizes, False), (self.small_sizes, True)]
+
+    def work_units(self):
+        units = []
+        options = self.unit_options()
+        for sizes, small in self.regimes():
+            for size in sizes:
+                for order in self.orders:
+                    seed = unit_seed(self.seed, order, size, small)
+                    for algo in self.algorithms:
+                        if not supports(algo, order):
+                            continue
+                        units.append(WorkUnit(algo, size, order, small, seed, self.policy, options))
+        return units
+
+    def result_key(self, order, size, small=False):
+        return f"{order}_{size}_small" if small else f"{order}_{size}"
 
     def run_experiments(self):
-        logging.info("Starting experiments for large lists")
-        for size in self.large_sizes:
+        units = self.work_units()
+        for unit in units:
+            self.results[unit.algo.name][self.result_key(unit.order, unit.size, unit.small)] = {'time': [], 'comparisons': []}
+        if self.store is not None:
+            units = self._resume(units)
+        if self.workers == 1:
+            self._run_serial(units)
+        else:
+            self._run_parallel(units)
+        if self.huge_sizes:
+            self.run_huge_experiments()
+        if self.stream_sizes:
+            self.run_stream_experiments()
+        if self.scaling_workers:
+            self.run_scaling_experiments()
+
+    def run_huge_experiments(self):
+        # One run per cell: each one streams the whole file through disk twice
+        external = ExternalMergeSort(self.external_algorithm, temp_dir=self.temp_dir)
+        self.results.setdefault(external.name, {})
+        version = algorithm_version(external) if self.store is not None else None
+        completed = self.store.load() if self.store is not None else {}
+        logging.info("Starting experiments for huge lists")
+        for size in self.huge_sizes:
+            for order in self.huge_orders():
+                key = f"{order}_{size}_huge"
+                params = {'seed': unit_seed(self.seed, order, size, 'huge')}
+                cell = self.store.cell_id(external.name, version, key, params) if self.store is not None else None
+                if cell in completed:
+                    self.results[external.name][key] = completed[cell]['result']
+                    continue
+                input_fd, input_path = tempfile.mkstemp(suffix='.bin', dir=self.temp_dir)
+                output_fd, output_path = tempfile.mkstemp(suffix='.bin', dir=self.temp_dir)
+                os.close(input_fd)
+                os.close(output_fd)
+                try:
+                    generate_file(input_path, size, order, params['seed'])
+                    stats = external.sort_file(input_path, output_path)
+                    if not verify_file(output_path, size):
+                        logging.error(f"{external.name} failed to sort {order} list of size {size} (huge)")
+                finally:
+                    os.remove(input_path)
+                    os.remove(output_path)
+                megabytes = (stats['bytes_read'] + stats['bytes_written']) / 2 ** 20
+                result = {
+                    'time': [stats['seconds'] * 1000],
+                    'comparisons': [],
+                    'throughput': [megabytes / stats['seconds']],
+                    'runs': stats['runs'],
+                    'bytes_read': stats['bytes_read'],
+                    'bytes_written': stats['bytes_written'],
+                }
+                self.results[external.name][key] = result
+                if self.store is not None:
+                    self.store.append(cell, external.name, version, key, params, result)
+                logging.info(f"Completed experiments for {external.name}, {order}, size {size} (huge): "
+                             f"{stats['seconds']:.1f} s, {result['throughput'][0]:.1f} MB/s")
+
+    def huge_orders(self):
+        # Input files are generated block by block, which only the permutation orders support
+        return [order for order in self.orders if order in FILE_ORDERS]
+
+    def run_stream_experiments(self):
+        # The whole arrival sequence is one timed run: every batch is pushed
+        # (or appended and re-sorted) and the final sorted list is produced
+        completed = self.store.load() if self.store is not None else {}
+        logging.info(f"Starting batch-arrival experiments (batches of {self.batch_size})")
+        for size in self.stream_sizes:
             for order in self.orders:
-                data = self.generate_data(size, order)
+                key = f"{order}_{size}_stream"
+                seed = unit_seed(self.seed, order, size, 'stream')
+                data = generate_data(size, order, make_rng(seed, self.backend), self.backend)
+                batches = [data[i:i + self.batch_size] for i in range(0, size, self.batch_size)]
+                params = {'seed': seed, 'batch_size': self.batch_size, 'fanout': self.stream_fanout,
+                          'policy': self.policy.as_dict()}
+
+                def check(sorted_arr):
+                    if len(sorted_arr) != size or not self.verify_sorted(sorted_arr):
+                        logging.error(f"{algo.name} failed to sort {order} batches of size {size} (stream)")
+
                 for algo in self.algorithms:
-                    key = f"{order}_{size}"
-                    self.results[algo.name][key] = {'time': [], 'comparisons': []}
-                    for _ in range(10):  
-                        start_time = time.perf_counter()
-                        sorted_arr = algo.sort_timing(data.copy())
-                        end_time = time.perf_counter()
-                        if not self.verify_sorted(sorted_arr):
-                            logging.error(f"{algo.name} failed to sort {order} list of size {size}")
-                        self.results[algo.name][key]['time'].append((end_time - start_time) * 1000)
-                        algo.reset_comparisons()
-                        sorted_arr = algo.sort_counting(data.copy())
-                        self.results[algo.name][key]['comparisons'].append(algo.comparisons)
-                        if not self.verify_sorted(sorted_arr):
-                            logging.error(f"{algo.name} failed to sort {order} list of size {size}")
-                    logging.info(f"Completed experiments for {algo.name}, {order}, size {size}")
-
-        logging.info("Starting experiments for small lists")
-        for size in self.small_sizes:
+                    if not supports(algo, order):
+                        continue
+                    version = algorithm_version(algo) if self.store is not None else None
+                    cell = self.store.cell_id(algo.name, version, key, params) if self.store is not None else None
+                    if cell in completed:
+                        self.results[algo.name][key] = completed[cell]['result']
+                        continue
+                    # configure_for may start a worker pool for the cell
+                    try:
+                        algo.configure_for(order)
+                        resort_times, _, _ = measure(lambda batches: resort_batches(algo, batches),
+                                                     lambda: batches, self.policy, check)
+                        times, stats, _ = measure(lambda batches: stream_batches(algo, batches, self.stream_fanout),
+                                                  lambda: batches, self.policy, check)
+                    finally:
+                        algo.close()
+                    result = {'time': times, 'comparisons': [], 'resort_time': resort_times, 'batches': len(batches)}
+                    result.update(stats)
+                    self.results[algo.name][key] = result
+                    if self.store is not None:
+                        self.store.append(cell, algo.name, version, key, params, result)
+                    logging.info(f"Completed batch-arrival experiments for {algo.name}, {order}, size {size}: "
+                                 f"{statistics.mean(times):.2f} ms incremental, {statistics.mean(resort_times):.2f} ms re-sorting")
+
+    def run_scaling_experiments(self):
+        completed = self.store.load() if self.store is not None else {}
+        logging.info(f"Starting scaling experiments on {len(available_cpus())} available CPUs")
+        for parallel in [ParallelMergeSort, SampleSort]:
+            for workers in self.scaling_workers:
+                algo = parallel(workers)
+                version = algorithm_version(algo) if self.store is not None else None
+                self.results.setdefault(algo.name, {})
+                try:
+                    for size in sorted({self.scaling_size, self.scaling_size * workers}):
+                        key = f"random_{size}_scaling"
+                        seed = unit_seed(self.seed, 'random', size, 'scaling')
+                        params = {'seed': seed, 'policy': self.policy.as_dict()}
+                        cell = self.store.cell_id(algo.name, version, key, params) if self.store is not None else None
+                        if cell in completed:
+                            self.results[algo.name][key] = completed[cell]['result']
+                            continue
+                        data = generate_data(size, 'random', make_rng(seed, self.backend), self.backend)
+
+                        def check(sorted_arr):
+                            if len(sorted_arr) != size or not self.verify_sorted(sorted_arr):
+                                logging.error(f"{algo.name} failed to sort random list of size {size} (scaling)")
+
+                        algo.configure_for('random')
+                        times, stats, _ = measure(algo.sort, lambda: copy(data), self.policy, check)
+                        result = {'time': times, 'comparisons': []}
+                        result.update(stats)
+                        self.results[algo.name][key] = result
+                        if self.store is not None:
+                            self.store.append(cell, algo.name, version, key, params, result)
+                        logging.info(f"Completed scaling experiments for {algo.name}, size {size}: "
+                                     f"{statistics.mean(times):.2f} ms")
+                finally:
+                    algo.close()
+
+    def _run_serial(self, units):
+        phase = None
+        for unit in units:
+            if unit.small != phase:
+                phase = unit.small
+                logging.info(f"Starting experiments for {'small' if phase else 'large'} lists")
+            self._store_unit(unit, run_unit(unit))
+
+    def _run_parallel(self, units):
+        # Engines with pools of their own run in this process once the grid is done
+        parent_units = [unit for unit in units if unit.algo.multiprocess]
+        units = [unit for unit in units if not unit.algo.multiprocess]
+        cpus = available_cpus()
+        # One worker per core at most; oversubscription shows up as timing noise
+        workers = min(self.workers or len(cpus), len(cpus))
+        logging.info(f"Starting experiments on {workers} worker processes ({len(units)} work units)")
+        initializer, initargs = None, ()
+        if self.pin_cpus:
+            initializer, initargs = _pin_worker, (cpus, multiprocessing.Value('i', 0))
+        # Submit the biggest cells first so the long tail does not end up on one worker
+        units = sorted(units, key=lambda unit: unit.size, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            futures = {pool.submit(run_unit, unit): unit for unit in units}
+            for future in as_completed(futures):
+                self._store_unit(futures[future], future.result())
+        if parent_units:
+            self._run_serial(parent_units)
+
+    def _cell(self, unit):
+        key = self.result_key(unit.order, unit.size, unit.small)
+        params = {'seed': unit.seed, 'policy': unit.policy.as_dict(), 'options': unit.options}
+        version = self.versions[unit.algo.name]
+        return self.store.cell_id(unit.algo.name, version, key, params), version, key, params
+
+    def _resume(self, units):
+        self.versions = {algo.name: algorithm_version(algo) for algo in self.algorithms}
+        completed = self.store.load()
+        pending = []
+        for unit in units:
+            cell, _, key, _ = self._cell(unit)
+            if cell in completed:
+                self.results[unit.algo.name][key] = completed[cell]['result']
+            else:
+                pending.append(unit)
+        logging.info(f"Loaded {len(units) - len(pending)} completed cells from {self.store.path}, {len(pending)} left to run")
+        return pending
+
+    def _store_unit(self, unit, result):
+        self.results[unit.algo.name][self.result_key(unit.order, unit.size, unit.small)] = result
+        if self.store is not None:
+            cell, version, key, params = self._cell(unit)
+            self.store.append(cell, unit.algo.name, version, key, params, result)
+        label = " (small)" if unit.small else ""
+        logging.info(f"Completed experiments for {unit.algo.name}, {unit.order}, size {unit.size}{label} "
+                     f"({result.get('repetitions', len(result['time']))} repetitions, {result.get('outliers', 0)} outliers)")
+
+    def tune_cutoffs(self, candidates=range(2, 65, 2), path=CUTOFF_CONFIG):
+        logging.info("Tuning insertion sort cutoffs for hybrid sorts")
+        cutoffs = {}
+        for hybrid in [HybridQuickSort, HybridMergeSort]:
+            cutoffs[hybrid.name] = {}
             for order in self.orders:
-                data = self.generate_data(size, order)
-                for algo in self.algorithms:
-                    key = f"{order}_{size}_small"
-                    self.results[algo.name][key] = {'time': [], 'comparisons': []}
-                    for _ in range(10):  
-                        start_time = time.perf_counter()
-                        sorted_arr = algo.sort_timing(data.copy())
-                        end_time = time.perf_counter()
-                        if not self.verify_sorted(sorted_arr):
-                            logging.error(f"{algo.name} failed to sort {order} list of size {size} (small)")
-                        self.results[algo.name][key]['time'].append((end_time - start_time) * 1000)
-                        algo.reset_comparisons()
-                        sorted_arr = algo.sort_counting(data.copy())
-                        self.results[algo.name][key]['comparisons'].append(algo.comparisons)
-                        if not self.verify_sorted(sorted_arr):
-                            logging.error(f"{algo.name} failed to sort {order} list of size {size} (small)")
-                    logging.info(f"Completed experiments for {algo.name}, {order}, size {size} (small)")
+                datasets = [generate_data(size, order, make_rng(unit_seed(self.seed, order, size, True), self.backend),
+                                          self.backend)
+                            for size in self.small_sizes]
+                best = None
+                for cutoff in candidates:
+                    algo = hybrid(cutoff=cutoff)
+                    total = 0.0
+                    for data in datasets:
+                        algo.configure_for(order)
+                        times, _, _ = measure(algo.sort, lambda: copy(data), self.policy)
+                        total += statistics.mean(times)
+                    if best is None or total < best[0]:
+                        best = (total, cutoff)
+                cutoffs[hybrid.name][order] = best[1]
+                logging.info(f"Best cutoff for {hybrid.name}, {order}: {best[1]}")
+        save_cutoffs(cutoffs, path)
+        logging.info(f"Saved cutoffs to {path}")
+        return cutoffs
 
     def verify_results(self):
         logging.info("Verifying experiment results")
         for algo in self.algorithms:
             for order in self.orders:
-                for size in self.large_sizes:
-                    key = f"{order}_{size}"
-                    if key not in self.results[algo.name]:
-                        logging.warning(f"Missing results for {algo.name}, {order}, size {size}")
-                for size in self.small_sizes:
-                    key = f"{order}_{size}_small"
-                    if key not in self.results[algo.name]:
-                        logging.warning(f"Missing results for {algo.name}, {order}, size {size} (small)")
+                if not supports(algo, order):
+                    continue
+                for sizes, small in self.regimes():
+                    for size in sizes:
+                        if self.result_key(order, size, small) not in self.results[algo.name]:
+                            logging.warning(f"Missing results for {algo.name}, {order}, size {size}{' (small)' if small else ''}")
+        if self.huge_sizes:
+            name = ExternalMergeSort(self.external_algorithm).name
+            for order in self.huge_orders():
+                for size in self.huge_sizes:
+                    if f"{order}_{size}_huge" not in self.results.get(name, {}):
+                        logging.warning(f"Missing results for {name}, {order}, size {size} (huge)")
+        for algo in self.algorithms:
+            for order in self.orders:
+                if not supports(algo, order):
+                    continue
+                for size in self.stream_sizes:
+                    if f"{order}_{size}_stream" not in self.results[algo.name]:
+                        logging.warning(f"Missing results for {algo.name}, {order}, size {size} (stream)")
+
+    def _comparison_columns(self, comps):
+        # Non-comparison sorts record no comparisons
+        if not comps:
+            return f"{'N/A':<15} {'N/A':<15} {'N/A':<20}"
+        comp_std = statistics.stdev(comps) if len(comps) > 1 else 0.0
+        comp_ci = self.calculate_confidence_interval(comps)
+        return f"{statistics.mean(comps):<15.0f} {comp_std:<15.0f} {f'[{comp_ci[0]:.0f}, {comp_ci[1]:.0f}]':<20}"
+
+    def crossover(self, algo_name, baseline_name, order):
+        # Smallest size from which algo_name is faster than baseline_name at
+        # every measured size; None if it never is
+        found = None
+        for size, small in [(size, small) for sizes, small in reversed(self.regimes()) for size in sizes]:
+            key = self.result_key(order, size, small)
+            cell = self.results.get(algo_name, {}).get(key, {})
+            baseline = self.results.get(baseline_name, {}).get(key, {})
+            if not cell.get('time') or not baseline.get('time'):
+                continue
+            if statistics.mean(cell['time']) < statistics.mean(baseline['time']):
+                found = size if found is None else found
+            else:
+                found = None
+        return found
 
     def log_numerical_results(self):
         logging.info("\n\n=== Numerical Results for Report ===")
+        ci_label = f"{self.policy.confidence:.0%}"
         
-        logging.info("\nLarge Lists (1000-10000 elements):")
-        for order in self.orders:
-            logging.info(f"\nOrder: {order.capitalize()}")
-            logging.info(f"{'Size':<10} {'Algorithm':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {'Time CI (95%)':<20} {'Avg Comparisons':<15} {'Comp StdDev':<15} {'Comp CI (95%)':<20}")
-            for size in self.large_sizes:
-                key = f"{order}_{size}"
-                for algo in self.algorithms:
-                    if key in self.results[algo.name]:
-                        times = self.results[algo.name][key]['time']
-                        comps = self.results[algo.name][key]['comparisons']
-                        avg_time = statistics.mean(times)
-                        time_std = statistics.stdev(times) if len(times) > 1 else 0.0
-                        time_ci = self.calculate_confidence_interval(times)
-                        avg_comps = statistics.mean(comps)
-                        comp_std = statistics.stdev(comps) if len(comps) > 1 else 0.0
-                        comp_ci = self.calculate_confidence_interval(comps)
-                        logging.info(f"{size:<10} {algo.name:<15} {avg_time:<15.2f} {time_std:<15.2f} {f'[{time_ci[0]:.2f}, {time_ci[1]:.2f}]':<20} {avg_comps:<15.0f} {comp_std:<15.0f} {f'[{comp_ci[0]:.0f}, {comp_ci[1]:.0f}]':<20}")
-
-        logging.info("\nSmall Lists (10-100 elements):")
+        for sizes, small in self.regimes():
+            if not sizes:
+                continue
+            precision = 4 if small else 2
+            logging.info(f"\n{'Small' if small else 'Large'} Lists ({sizes[0]}-{sizes[-1]} elements):")
+            for order in self.orders:
+                logging.info(f"\nOrder: {order.capitalize()}")
+                logging.info(f"{'Size':<10} {'Algorithm':<45} {'Avg Time (ms)':<15} {'Time StdDev':<15} {f'Time CI ({ci_label})':<20} {'Avg Comparisons':<15} {'Comp StdDev':<15} {f'Comp CI ({ci_label})':<20} {'Bytes/Elem':<10}")
+                for size in sizes:
+                    key = self.result_key(order, size, small)
+                    for algo in self.algorithms:
+                        if key in self.results[algo.name]:
+                            cell = self.results[algo.name][key]
+                            times = cell['time']
+                            comps = cell['comparisons']
+                            avg_time = statistics.mean(times)
+                            time_std = statistics.stdev(times) if len(times) > 1 else 0.0
+                            time_ci = self.calculate_confidence_interval(times)
+                            ci = f"[{time_ci[0]:.{precision}f}, {time_ci[1]:.{precision}f}]"
+                            logging.info(f"{size:<10} {algo.name:<45} {avg_time:<15.{precision}f} {time_std:<15.{precision}f} {ci:<20} {self._comparison_columns(comps)} {cell.get('bytes_per_element', 0.0):<10.1f}")
+
+        if self.instrument:
+            logging.info("\nInstrumentation (one run per cell):")
+            headings = ''.join(f"{heading:<15}" for heading, _, _ in METRICS.values())
+            logging.info(f"{'Order':<15} {'Size':<10} {'Algorithm':<45} {headings}")
+            for order in self.orders:
+                for size in self.large_sizes:
+                    key = self.result_key(order, size)
+                    for algo in self.algorithms:
+                        cell = self.results[algo.name].get(key, {})
+                        if all(metric in cell for metric in METRICS):
+                            values = ''.join(f"{statistics.mean(cell[metric]):<15{fmt}}"
+                                             for metric, (_, _, fmt) in METRICS.items())
+                            logging.info(f"{order.capitalize():<15} {size:<10} {algo.name:<45} {values}")
+
+        if self.huge_sizes:
+            name = ExternalMergeSort(self.external_algorithm).name
+            logging.info(f"\nHuge Lists ({name}):")
+            logging.info(f"{'Size':<12} {'Order':<15} {'Time (s)':<12} {'Runs':<8} {'Read (MB)':<12} {'Written (MB)':<14} {'MB/s':<10}")
+            for order in self.huge_orders():
+                for size in self.huge_sizes:
+                    cell = self.results.get(name, {}).get(f"{order}_{size}_huge")
+                    if cell:
+                        logging.info(f"{size:<12} {order.capitalize():<15} {cell['time'][0] / 1000:<12.2f} {cell['runs']:<8} "
+                                     f"{cell['bytes_read'] / 2 ** 20:<12.1f} {cell['bytes_written'] / 2 ** 20:<14.1f} {cell['throughput'][0]:<10.1f}")
+
+        if self.stream_sizes:
+            logging.info(f"\nBatch Arrival (batches of {self.batch_size}, fanout {self.stream_fanout}):")
+            logging.info(f"{'Order':<15} {'Size':<10} {'Algorithm':<45} {'Incremental (ms)':<18} {'Re-sort (ms)':<15} {'Speedup':<10}")
+            for order in self.orders:
+                for size in self.stream_sizes:
+                    for algo in self.algorithms:
+                        cell = self.results[algo.name].get(f"{order}_{size}_stream")
+                        if cell:
+                            incremental = statistics.mean(cell['time'])
+                            resort = statistics.mean(cell['resort_time'])
+                            logging.info(f"{order.capitalize():<15} {size:<10} {algo.name:<45} {incremental:<18.2f} {resort:<15.2f} {resort / incremental:<10.1f}")
+
+        integer_sorts = [algo for algo in self.algorithms if isinstance(algo, IntegerSort)]
+        if integer_sorts and self.large_sizes:
+            logging.info("\nNon-comparison Sorts (largest size per order):")
+            headings = ''.join(f"{heading:<15}" for heading, _, _ in COUNTERS.values())
+            logging.info(f"{'Order':<18} {'Size':<10} {'Algorithm':<30} {'Avg Time (ms)':<15} {headings}")
+            for order in self.orders:
+                key = self.result_key(order, self.large_sizes[-1])
+                for algo in integer_sorts:
+                    cell = self.results[algo.name].get(key, {})
+                    if cell.get('time') and all(counter in cell for counter in COUNTERS):
+                        values = ''.join(f"{statistics.mean(cell[counter]):<15{fmt}}"
+                                         for counter, (_, _, fmt) in COUNTERS.items())
+                        logging.info(f"{order.capitalize():<18} {self.large_sizes[-1]:<10} {algo.name:<30} "
+                                     f"{statistics.mean(cell['time']):<15.2f} {values}")
+            baselines = [name for name in ['Quick Sort', 'Merge Sort'] if name in self.results]
+            if baselines:
+                logging.info("\nCrossover vs Comparison Sorts (faster from this size on):")
+                logging.info(f"{'Order':<18} {'Algorithm':<30} " + ''.join(f"{name:<15}" for name in baselines))
+                for order in self.orders:
+                    for algo in integer_sorts:
+                        if not supports(algo, order):
+                            continue
+                        sizes = [self.crossover(algo.name, name, order) for name in baselines]
+                        logging.info(f"{order.capitalize():<18} {algo.name:<30} "
+                                     + ''.join(f"{'never' if size is None else size:<15}" for size in sizes))
+
+        if self.scaling_workers:
+            logging.info(f"\nScaling (random input, strong: {self.scaling_size} elements, weak: {self.scaling_size} per worker):")
+            logging.info(f"{'Algorithm':<25} {'Workers':<10} {'Strong (ms)':<15} {'Speedup':<10} {'Efficiency':<12} {'Weak (ms)':<15} {'Weak Eff.':<10}")
+            base = min(self.scaling_workers)
+            for parallel in [ParallelMergeSort, SampleSort]:
+                def mean_time(workers, size):
+                    cell = self.results.get(parallel.variant_name(workers), {}).get(f"random_{size}_scaling")
+                    return statistics.mean(cell['time']) if cell and cell['time'] else None
+
+                strong_base = mean_time(base, self.scaling_size)
+                weak_base = mean_time(base, self.scaling_size * base)
+                for workers in self.scaling_workers:
+                    strong = mean_time(workers, self.scaling_size)
+                    weak = mean_time(workers, self.scaling_size * workers)
+                    if None in (strong, weak, strong_base, weak_base):
+                        continue
+                    # Speedup and efficiency are relative to the smallest worker count
+                    speedup = strong_base / strong
+                    logging.info(f"{parallel.label:<25} {workers:<10} {strong:<15.2f} {speedup:<10.2f} {speedup * base / workers:<12.2f} "
+                                 f"{weak:<15.2f} {weak_base / weak:<10.2f}")
+
+        logging.info("\nFastest Algorithm per Order:")
+        logging.info(f"{'Order':<15} {'Size':<10} {'Algorithm':<45} {'Avg Time (ms)':<15}")
         for order in self.orders:
-            logging.info(f"\nOrder: {order.capitalize()}")
-            logging.info(f"{'Size':<10} {'Algorithm':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {'Time CI (95%)':<20} {'Avg Comparisons':<15} {'Comp StdDev':<15} {'Comp CI (95%)':<20}")
-            for size in self.small_sizes:
-                key = f"{order}_{size}_small"
-                for algo in self.algorithms:
-                    if key in self.results[algo.name]:
-                        times = self.results[algo.name][key]['time']
-                        comps = self.results[algo.name][key]['comparisons']
-                        avg_time = statistics.mean(times)
-                        time_std = statistics.stdev(times) if len(times) > 1 else 0.0
-                        time_ci = self.calculate_confidence_interval(times)
-                        avg_comps = statistics.mean(comps)
-                        comp_std = statistics.stdev(comps) if len(comps) > 1 else 0.0
-                        comp_ci = self.calculate_confidence_interval(comps)
-                        logging.info(f"{size:<10} {algo.name:<15} {avg_time:<15.4f} {time_std:<15.4f} {f'[{time_ci[0]:.4f}, {time_ci[1]:.4f}]':<20} {avg_comps:<15.0f} {comp_std:<15.0f} {f'[{comp_ci[0]:.0f}, {comp_ci[1]:.0f}]':<20}")
+            for size, small in [(sizes[-1], small) for sizes, small in self.regimes() if sizes]:
+                key = self.result_key(order, size, small)
+                timed = [(statistics.mean(self.results[algo.name][key]['time']), algo.name)
+                         for algo in self.algorithms if self.results[algo.name].get(key, {}).get('time')]
+                if timed:
+                    avg_time, name = min(timed)
+                    logging.info(f"{order.capitalize():<15} {size:<10} {name:<45} {avg_time:<15.4f}")
 
         logging.info("\nSpecial Case Comparisons:")
         logging.info("\nInsertion Sort Best vs Worst Case:")
-        logging.info(f"{'Size':<10} {'Order':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {'Time CI (95%)':<20}")
+        logging.info(f"{'Size':<10} {'Order':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {f'Time CI ({ci_label})':<20}")
         for size in self.large_sizes:
             for order in ['ascending', 'descending']:
                 key = f"{order}_{size}"
-                if key in self.results['Insertion Sort']:
+                if key in self.results.get('Insertion Sort', {}):
                     times = self.results['Insertion Sort'][key]['time']
                     avg_time = statistics.mean(times)
                     time_std = statistics.stdev(times) if len(times) > 1 else 0.0
@@ -153,13 +639,27 @@ class SortingExperiment:
                     logging.info(f"{size:<10} {order.capitalize():<15} {avg_time:<15.2f} {time_std:<15.2f} {f'[{time_ci[0]:.2f}, {time_ci[1]:.2f}]':<20}")
 
         logging.info("\nQuick Sort Pivot Impact:")
-        logging.info(f"{'Size':<10} {'Order':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {'Time CI (95%)':<20}")
+        logging.info(f"{'Size':<10} {'Order':<15} {'Avg Time (ms)':<15} {'Time StdDev':<15} {f'Time CI ({ci_label})':<20}")
         for size in self.large_sizes:
             for order in ['random', 'ascending']:
                 key = f"{order}_{size}"
-                if key in self.results['Quick Sort']:
+                if key in self.results.get('Quick Sort', {}):
                     times = self.results['Quick Sort'][key]['time']
                     avg_time = statistics.mean(times)
                     time_std = statistics.stdev(times) if len(times) > 1 else 0.0
                     time_ci = self.calculate_confidence_interval(times)
-                    logging.info(f"{size:<10} {order.capitalize():<15} {avg_time:<15.2f} {time_std:<15.2f} {f'[{time_ci[0]:.2f}, {time_ci[1]:.2f}]':<20}")
\ No newline at end of file
+                    logging.info(f"{size:<10} {order.capitalize():<15} {avg_time:<15.2f} {time_std:<15.2f} {f'[{time_ci[0]:.2f}, {time_ci[1]:.2f}]':<20}")
+
+        if 'Tim Sort' in self.results and 'Built-in sorted' in self.results:
+            logging.info("\nTim Sort vs Built-in sorted (C reference):")
+            logging.info(f"{'Size':<10} {'Order':<18} {'Tim Sort (ms)':<15} {'sorted (ms)':<15} {'Ratio':<10} {'Tim Comps':<12} {'sorted Comps':<12}")
+            for order in self.orders:
+                for size in self.large_sizes:
+                    key = f"{order}_{size}"
+                    tim = self.results['Tim Sort'].get(key)
+                    builtin = self.results['Built-in sorted'].get(key)
+                    if tim and builtin and tim['time'] and builtin['time']:
+                        tim_time = statistics.mean(tim['time'])
+                        builtin_time = statistics.mean(builtin['time'])
+                        logging.info(f"{size:<10} {order.capitalize():<18} {tim_time:<15.2f} {builtin_time:<15.4f} {tim_time / builtin_time:<10.1f} "
+                                     f"{statistics.mean(tim['comparisons']):<12.0f} {statistics.mean(builtin['comparisons']):<12.0f}")
@@ -0,0 +1,115 @@
+import os
+import mmap
+import time
+import heapq
+import random
+import tempfile
+from array import array
+from sorting_algorithms import ALGORITHMS
+
+ITEM_SIZE = array('q').itemsize
+FILE_ORDERS = ('random', 'ascending', 'descending')
+
+def _read_run(path, buffer_elements):
+    # Streams a sorted run back in blocks of buffer_elements keys
+    with open(path, 'rb') as f:
+        while True:
+            block = array('q')
+            try:
+                block.fromfile(f, buffer_elements)
+            except EOFError:
+                pass
+            if not block:
+                return
+            yield from block
+
+class ExternalMergeSort:
+    # Sorts a binary file of native 64-bit signed keys that need not fit in
+    # memory: chunks of the memory-mapped input are sorted with an in-memory
+    # engine, spilled to temporary run files and k-way merged with a heap.
+    def __init__(self, algorithm='Quick Sort (median3, hoare, introsort)', chunk_elements=1 << 20,
+                 buffer_elements=1 << 16, temp_dir=None):
+        self.algorithm = ALGORITHMS[algorithm]()
+        self.chunk_elements = chunk_elements
+        self.buffer_elements = buffer_elements
+        self.temp_dir = temp_dir
+        self.name = f"External Merge Sort ({self.algorithm.name})"
+
+    def config(self):
+        return {'algorithm': self.algorithm.name, 'algorithm_config': self.algorithm.config(),
+                'chunk_elements': self.chunk_elements, 'buffer_elements': self.buffer_elements}
+
+    def dependencies(self):
+        return [self.algorithm]
+
+    def sort_file(self, input_path, output_path):
+        stats = {'bytes_read': 0, 'bytes_written': 0, 'runs': 0}
+        start_time = time.perf_counter()
+        runs = self._write_runs(input_path, stats)
+        try:
+            self._merge_runs(runs, output_path, stats)
+        finally:
+            for path in runs:
+                os.remove(path)
+        stats['seconds'] = time.perf_counter() - start_time
+        return stats
+
+    def _write_runs(self, input_path, stats):
+        runs = []
+        size = os.path.getsize(input_path)
+        if size == 0:
+            return runs
+        chunk_bytes = self.chunk_elements * ITEM_SIZE
+        with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, size, chunk_bytes):
+                chunk = array('q')
+                chunk.frombytes(mm[offset:offset + chunk_bytes])
+                stats['bytes_read'] += len(chunk) * ITEM_SIZE
+                ordered = array('q', self.algorithm.sort(chunk.tolist()))
+                fd, path = tempfile.mkstemp(suffix='.run', dir=self.temp_dir)
+                with os.fdopen(fd, 'wb') as run:
+                    ordered.tofile(run)
+                stats['bytes_written'] += len(ordered) * ITEM_SIZE
+                runs.append(path)
+        stats['runs'] = len(runs)
+        return runs
+
+    def _merge_runs(self, runs, output_path, stats):
+        out = array('q')
+        with open(output_path, 'wb') as f:
+            for value in heapq.merge(*(_read_run(path, self.buffer_elements) for path in runs)):
+                out.append(value)
+                if len(out) >= self.buffer_elements:
+                    out.tofile(f)
+                    out = array('q')
+            out.tofile(f)
+        # Every run is read back once and the merged output written once
+        stats['bytes_read'] += sum(os.path.getsize(path) for path in runs)
+        stats['bytes_written'] += os.path.getsize(output_path)
+
+def generate_file(path, size, order, seed, block_elements=1 << 16):
+    # Random keys are drawn from [0, size) with replacement, a permutation of
+    # a huge range would have to be held in memory
+    if order not in FILE_ORDERS:
+        raise ValueError(f"Unsupported order for file generation: {order}")
+    rng = random.Random(seed)
+    with open(path, 'wb') as f:
+        for start in range(0, size, block_elements):
+            end = min(start + block_elements, size)
+            if order == 'random':
+                block = array('q', (rng.randrange(size) for _ in range(end - start)))
+            elif order == 'descending':
+                block = array('q', range(size - 1 - start, size - 1 - end, -1))
+            else:
+                block = array('q', range(start, end))
+            block.tofile(f)
+
+def verify_file(path, expected_size, block_elements=1 << 16):
+    count = 0
+    previous = None
+    for value in _read_run(path, block_elements):
+        if previous is not None and value < previous:
+            return False
+        previous = value
+        count += 1
+    return count == expected_size
@@ -0,0 +1,95 @@
+import gc
+import sys
+import tracemalloc
+
+# Metric name -> (table heading, plot label, table format); every metric is
+# stored as a one-element list in the result cell, like 'comparisons'
+METRICS = {
+    'peak_memory': ('Peak Mem (KB)', 'Peak Traced Memory (KB)', '.1f'),
+    'allocations': ('Allocations', 'Allocated Blocks', '.0f'),
+    'max_depth': ('Max Depth', 'Max Call Depth', '.0f'),
+    'moves': ('Moves', 'Element Writes', '.0f'),
+    'gc_collections': ('GC Runs', 'GC Collections', '.0f'),
+}
+
+class MoveCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+class InstrumentedList(list):
+    # Counts element writes; copy.copy keeps the counter shared, so buffers
+    # an engine derives from its input are counted as well
+    def __init__(self, items, counter):
+        super().__init__(items)
+        self.counter = counter
+
+    def __setitem__(self, index, value):
+        self.counter.count += 1
+        super().__setitem__(index, value)
+
+_SETITEM_CODE = InstrumentedList.__setitem__.__code__
+
+class CallProfiler:
+    # Tracks Python call depth relative to the profiled call and samples the
+    # interpreter's allocated block count on every call and return. Blocks
+    # gained between two events are summed as allocations, which undercounts
+    # blocks allocated and freed within one stretch of a function body.
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        self.allocations = 0
+        self.blocks = sys.getallocatedblocks()
+
+    def __call__(self, frame, event, arg):
+        if frame.f_code is _SETITEM_CODE:
+            return
+        if event == 'call':
+            self.depth += 1
+            if self.depth > self.max_depth:
+                self.max_depth = self.depth
+        elif event == 'return':
+            self.depth -= 1
+        else:
+            return
+        blocks = sys.getallocatedblocks()
+        if blocks > self.blocks:
+            self.allocations += blocks - self.blocks
+        self.blocks = blocks
+
+def measure_peak_memory(algo, data):
+    # Traced separately from the timed runs, tracemalloc slows allocation down
+    arr = list(data)
+    tracemalloc.start()
+    try:
+        algo.sort(arr)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def instrument(algo, data):
+    metrics = {'peak_memory': [measure_peak_memory(algo, data)]}
+    moves = MoveCounter()
+    arr = InstrumentedList(data, moves)
+    collections = []
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            collections.append(info['generation'])
+
+    profiler = CallProfiler()
+    gc.callbacks.append(on_gc)
+    sys.setprofile(profiler)
+    try:
+        algo.sort(arr)
+    finally:
+        sys.setprofile(None)
+        gc.callbacks.remove(on_gc)
+    # The profiled call itself counts as depth 1
+    metrics['allocations'] = [profiler.allocations]
+    metrics['max_depth'] = [profiler.max_depth - 1]
+    metrics['moves'] = [moves.count]
+    metrics['gc_collections'] = [len(collections)]
+    return metrics
@@ -0,0 +1,71 @@
+import time
+import random
+import asyncio
+import logging
+import argparse
+from array import array
+from service import DEFAULT_PORT, LatencyHistogram, SortClient
+from utils import setup_logging
+
+# Drives a running sort service with concurrent clients and reports the
+# client-side latency percentiles and throughput next to the server's own
+# counters, for capacity planning.
+
+async def run_client(client, jobs, histogram, args, rng):
+    elements = 0
+    for _ in range(jobs):
+        size = args.large_size if rng.random() < args.large_fraction else args.size
+        payload = array('q', (rng.randrange(size) for _ in range(size))).tobytes()
+        start_time = time.perf_counter()
+        result = await client.sort(payload, args.algorithm)
+        histogram.record(time.perf_counter() - start_time)
+        if args.verify and any(result[i] > result[i + 1] for i in range(len(result) - 1)):
+            logging.error(f"Unsorted response for a job of {size} elements")
+        elements += size
+    return elements
+
+async def run(args):
+    clients = [await SortClient.connect(args.unix, args.host, args.port) for _ in range(args.connections)]
+    histogram = LatencyHistogram()
+    jobs = [args.requests // args.connections + (i < args.requests % args.connections) for i in range(args.connections)]
+    start_time = time.perf_counter()
+    # Each connection runs `concurrency` pipelined request streams
+    streams = [run_client(client, count // args.concurrency + (j < count % args.concurrency), histogram, args,
+                          random.Random(args.seed + i * args.concurrency + j))
+               for i, (client, count) in enumerate(zip(clients, jobs)) for j in range(args.concurrency)]
+    elements = sum(await asyncio.gather(*streams))
+    elapsed = time.perf_counter() - start_time
+    server = await clients[0].stats()
+    for client in clients:
+        await client.close()
+    summary = histogram.summary()
+    logging.info(f"{summary['count']} jobs in {elapsed:.2f} s: {summary['count'] / elapsed:.1f} jobs/s, "
+                 f"{elements / elapsed:.0f} elements/s")
+    logging.info(f"Client latency: mean {summary['mean_ms']:.2f} ms, p50 {summary['p50_ms']:.2f} ms, "
+                 f"p90 {summary['p90_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, max {summary['max_ms']:.2f} ms")
+    for kind, latency in server['latency'].items():
+        if latency['count']:
+            logging.info(f"Server {kind} latency: {latency['count']} jobs, p50 {latency['p50_ms']:.2f} ms, "
+                         f"p99 {latency['p99_ms']:.2f} ms")
+    logging.info(f"Server: {server['jobs']} jobs, {server['errors']} errors, {server['batches']} micro-batches")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against a running sort service")
+    parser.add_argument('--unix', help="Unix socket path (default: TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=4, help="pipelined request streams per connection")
+    parser.add_argument('--requests', type=int, default=1000, help="total number of jobs")
+    parser.add_argument('--size', type=int, default=1000, help="elements per small job")
+    parser.add_argument('--large-size', type=int, default=100000, help="elements per large job")
+    parser.add_argument('--large-fraction', type=float, default=0.01, help="fraction of jobs that are large")
+    parser.add_argument('--algorithm', default='Tim Sort')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verify', action='store_true', help="check that every response is sorted")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
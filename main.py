@@ -1,25 +1,109 @@
+import os
 import logging
-from experiment import SortingExperiment
-from plotting import plot_comparison_graphs, plot_individual_algorithm_graphs, plot_special_cases
+import argparse
+from spec import GRAPH_KINDS, build_experiments, default_spec, load_spec, merge_spec, parse_sizes
+from sorting_algorithms import ALGORITHMS
+from distributions import DISTRIBUTIONS
+from representations import REPRESENTATIONS, log_representation_overhead
+from analysis import log_complexity_fits
 from utils import setup_logging
 from datetime import datetime
 
+def size_list(text):
+    # argparse only shows the message of an ArgumentTypeError
+    try:
+        return parse_sizes(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the sorting algorithm experiment")
+    parser.add_argument('--spec', help="experiment spec (.json, .toml or .yaml); flags below override it")
+    parser.add_argument('--algorithms', nargs='+', help="algorithm names (see --list)")
+    parser.add_argument('--orders', nargs='+', help="input distributions (see --list)")
+    parser.add_argument('--sizes', type=size_list,
+                        help="large list sizes: '1000,2000', 'start:stop:step', 'start:stop:xFACTOR' or 'start:stop:Np'")
+    parser.add_argument('--small-sizes', type=size_list, help="small list sizes, same forms as --sizes ('none' to skip)")
+    parser.add_argument('--repetitions', type=int, help="fixed repetitions per cell instead of the adaptive policy")
+    parser.add_argument('--workers', type=int, help="worker processes (0: one per available CPU)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--representations', nargs='+', choices=REPRESENTATIONS,
+                        help="run the grid once per representation and compare them")
+    parser.add_argument('--store', help="JSON Lines result store")
+    parser.add_argument('--no-store', action='store_true', help="do not read or write a result store")
+    parser.add_argument('--graphs', nargs='+', choices=GRAPH_KINDS + ['none'], help="graph kinds to render")
+    parser.add_argument('--figures-dir', help="directory for the PNG files")
+    parser.add_argument('--no-fits', action='store_true', help="skip the complexity fits")
+    parser.add_argument('--list', action='store_true', help="list the available algorithms and distributions")
+    args = parser.parse_args(argv)
+    if args.graphs and 'none' in args.graphs and len(args.graphs) > 1:
+        parser.error("--graphs none cannot be combined with other graph kinds")
+    return args
+
+def spec_from_args(args):
+    spec = load_spec(args.spec) if args.spec else default_spec()
+    graphs = [] if args.graphs == ['none'] else args.graphs
+    return merge_spec(spec, {
+        'algorithms': args.algorithms,
+        'orders': args.orders,
+        'large_sizes': args.sizes,
+        'small_sizes': args.small_sizes,
+        'repetitions': args.repetitions,
+        'workers': args.workers,
+        'seed': args.seed,
+        'representations': args.representations,
+        'store': args.store,
+        'outputs': {'graphs': graphs, 'figures_dir': args.figures_dir, 'fits': False if args.no_fits else None},
+    })
+
 def main():
+    args = parse_args()
+    if args.list:
+        print("Algorithms:\n  " + "\n  ".join(ALGORITHMS))
+        print("Distributions:\n  " + "\n  ".join(DISTRIBUTIONS))
+        return
     setup_logging()
+    spec = spec_from_args(args)
+    if args.no_store:
+        spec['store'] = None
+    outputs = spec['outputs']
     logging.info("Starting sorting experiment")
-    experiment = SortingExperiment()
-    experiment.run_experiments()
-    experiment.verify_results()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    plot_comparison_graphs(experiment, timestamp)
-    plot_individual_algorithm_graphs(experiment, timestamp)
-    plot_special_cases(experiment, timestamp)
-    experiment.log_numerical_results()
-    logging.info("Experiments completed. Please check the generated graphs and numerical results in the logs.")
+    experiments = build_experiments(spec)
+    for experiment in experiments:
+        experiment.run_experiments()
+        experiment.verify_results()
+    # Figures are drawn for the first representation only
+    experiment = experiments[0]
+    if outputs['graphs']:
+        # Plotting is only imported when figures are requested
+        from plotting import plot_comparison_graphs, plot_individual_algorithm_graphs, plot_special_cases
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(outputs['figures_dir'], exist_ok=True)
+        plotters = {
+            'comparison': plot_comparison_graphs,
+            'individual': plot_individual_algorithm_graphs,
+            'special': plot_special_cases,
+        }
+        for kind in outputs['graphs']:
+            plotters[kind](experiment, timestamp, outputs['figures_dir'])
+    for run in experiments:
+        if len(experiments) > 1:
+            logging.info(f"\n=== Representation: {run.representation} ===")
+        if outputs['numerical']:
+            run.log_numerical_results()
+        if outputs['fits']:
+            log_complexity_fits(run)
+    if len(experiments) > 1:
+        log_representation_overhead(experiments)
+    if outputs['graphs']:
+        logging.info("Experiments completed. Please check the generated graphs and numerical results in the logs.")
+    else:
+        logging.info("Experiments completed. Please check the numerical results in the logs.")
     print("\nFor your report, include:")
-    print("- The generated graphs (saved as PNG files)")
+    if outputs['graphs']:
+        print("- The generated graphs (saved as PNG files)")
     print("- The numerical results from the logs (shown above)")
     print("- Analysis comparing the algorithms' performance")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,191 +1,170 @@
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from datetime import datetime
+import os
+import json
+import inspect
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from results_store import fingerprint
+from instrumentation import METRICS
+from sorting_algorithms import COUNTERS
 
-def plot_comparison_graphs(experiment, timestamp):
-    logging.info("Generating comparison graphs")
+FIGURE_CACHE = '.figures.json'
+
+# Figures are described as plain dicts ("specs") so they can be built from a
+# live experiment or from stored results, shipped to worker processes, and
+# fingerprinted to skip re-rendering figures whose inputs did not change.
+
+def _filename(stem, timestamp):
+    return f"{stem}_{timestamp}.png" if timestamp else f"{stem}.png"
+
+def _mean_series(experiment, algo_name, order, small, metric):
+    sizes = []
+    values = []
+    for size in (experiment.small_sizes if small else experiment.large_sizes):
+        key = f"{order}_{size}_small" if small else f"{order}_{size}"
+        cell = experiment.results.get(algo_name, {}).get(key)
+        if cell and cell.get(metric):
+            sizes.append(size)
+            values.append(sum(cell[metric]) / len(cell[metric]))
+    return sizes, values
+
+def _line(label, sizes, values, color=None, linestyle='-'):
+    return {'label': label, 'x': sizes, 'y': values, 'color': color, 'linestyle': linestyle}
+
+def _metrics(experiment):
+    # Instrumentation metrics and integer sort counters are plotted only when
+    # the run recorded them
+    metrics = [('time', 'Time (ms)'), ('comparisons', 'Comparisons')]
+    cells = [cell for algo_results in experiment.results.values() for cell in algo_results.values()]
+    for metric, (_, label, _) in list(METRICS.items()) + list(COUNTERS.items()):
+        if any(cell.get(metric) for cell in cells):
+            metrics.append((metric, label))
+    return metrics
+
+def comparison_figures(experiment, timestamp=None):
+    specs = []
     for order in experiment.orders:
+        for metric, ylabel in _metrics(experiment):
+            for small in [False, True]:
+                lines = []
+                for algo_name in experiment.results:
+                    sizes, values = _mean_series(experiment, algo_name, order, small, metric)
+                    if sizes:
+                        lines.append(_line(algo_name, sizes, values, experiment.colors.get(algo_name),
+                                           experiment.line_styles.get(order, '-')))
+                if not lines:
+                    continue
+                specs.append({
+                    'filename': _filename(f"comparison_{metric}_{order}{'_small' if small else ''}", timestamp),
+                    'title': f"Algorithm Comparison{' (Small Lists)' if small else ''}\n{order.capitalize()} Order - {ylabel}",
+                    'ylabel': ylabel,
+                    'log': True,
+                    'lines': lines,
+                })
+    return specs
+
+def individual_figures(experiment, timestamp=None):
+    specs = []
+    for algo_name in experiment.results:
         for metric, ylabel in [('time', 'Time (ms)'), ('comparisons', 'Comparisons')]:
-            plt.figure(figsize=(10, 6))
-            lines = []
-            labels = []
-            for algo in experiment.algorithms:
-                algo_name = algo.name
-                color = experiment.colors[algo_name]
-                sizes = []
-                values = []
-                for size in experiment.large_sizes:
-                    key = f"{order}_{size}"
-                    if key in experiment.results[algo_name]:
-                        sizes.append(size)
-                        values.append(sum(experiment.results[algo_name][key][metric]) / len(experiment.results[algo_name][key][metric]))
-                line, = plt.plot(sizes, values, color=color, linestyle=experiment.line_styles[order], linewidth=2)
-                lines.append(line)
-                labels.append(algo_name)
-            
-            plt.yscale('log')
-            plt.title(f"Algorithm Comparison\n{order.capitalize()} Order - {ylabel}", pad=20)
-            plt.xlabel("List Size (elements)", fontsize=12)
-            plt.ylabel(ylabel, fontsize=12)
-            plt.legend(lines, labels, fontsize=10, framealpha=0.9)
-            plt.grid(True, which="both", alpha=0.3)
-            filename = f"comparison_{metric}_{order}_{timestamp}.png"
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
-            logging.info(f"Saved graph: {filename}")
-            plt.close()
+            for small in [False, True]:
+                lines = []
+                for order in experiment.orders:
+                    sizes, values = _mean_series(experiment, algo_name, order, small, metric)
+                    lines.append(_line(f"{order.capitalize()} Order", sizes, values,
+                                       linestyle=experiment.line_styles.get(order, '-')))
+                if not any(line['x'] for line in lines):
+                    continue
+                stem = f"individual_{algo_name.lower().replace(' ', '_')}_{metric}{'_small' if small else ''}"
+                specs.append({
+                    'filename': _filename(stem, timestamp),
+                    'title': f"{algo_name} Performance{' (Small Lists)' if small else ''}\n{ylabel}",
+                    'ylabel': ylabel,
+                    'log': False,
+                    'lines': lines,
+                })
+    return specs
 
-            plt.figure(figsize=(10, 6))
-            lines = []
-            labels = []
-            for algo in experiment.algorithms:
-                algo_name = algo.name
-                color = experiment.colors[algo_name]
-                sizes = []
-                values = []
-                for size in experiment.small_sizes:
-                    key = f"{order}_{size}_small"
-                    if key in experiment.results[algo_name]:
-                        sizes.append(size)
-                        values.append(sum(experiment.results[algo_name][key][metric]) / len(experiment.results[algo_name][key][metric]))
-                line, = plt.plot(sizes, values, color=color, linestyle=experiment.line_styles[order], linewidth=2)
-                lines.append(line)
-                labels.append(algo_name)
-            
-            plt.yscale('log')
-            plt.title(f"Algorithm Comparison (Small Lists)\n{order.capitalize()} Order - {ylabel}", pad=20)
-            plt.xlabel("List Size (elements)", fontsize=12)
-            plt.ylabel(ylabel, fontsize=12)
-            plt.legend(lines, labels, fontsize=10, framealpha=0.9)
-            plt.grid(True, which="both", alpha=0.3)
-            filename = f"comparison_{metric}_{order}_small_{timestamp}.png"
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
-            logging.info(f"Saved graph: {filename}")
-            plt.close()
+def special_case_figures(experiment, timestamp=None):
+    cases = [
+        ('Insertion Sort', ['ascending', 'descending'], "Insertion Sort: Best vs Worst Case",
+         "special_insertion_sort_best_worst"),
+        ('Quick Sort', ['random', 'ascending'], "Quick Sort: Pivot Impact", "special_quick_sort_pivot_impact"),
+        ('Merge Sort', experiment.orders, "Merge Sort: Consistency", "special_merge_sort_consistency"),
+    ]
+    specs = []
+    for algo_name, orders, title, stem in cases:
+        if algo_name not in experiment.results:
+            continue
+        lines = []
+        for order in orders:
+            sizes, values = _mean_series(experiment, algo_name, order, False, 'time')
+            lines.append(_line(f"{order.capitalize()} Order", sizes, values,
+                               linestyle=experiment.line_styles.get(order, '-')))
+        specs.append({
+            'filename': _filename(stem, timestamp),
+            'title': f"{title}\nTime (ms)",
+            'ylabel': "Time (ms)",
+            'log': False,
+            'lines': lines,
+        })
+    return specs
 
-def plot_individual_algorithm_graphs(experiment, timestamp):
-    logging.info("Generating individual algorithm graphs")
-    for algo in experiment.algorithms:
-        for metric, ylabel in [('time', 'Time (ms)'), ('comparisons', 'Comparisons')]:
-            plt.figure(figsize=(10, 6))
-            for order in experiment.orders:
-                sizes = []
-                values = []
-                for size in experiment.large_sizes:
-                    key = f"{order}_{size}"
-                    if key in experiment.results[algo.name]:
-                        sizes.append(size)
-                        values.append(sum(experiment.results[algo.name][key][metric])/len(experiment.results[algo.name][key][metric]))
-                plt.plot(sizes, values, 
-                        linestyle=experiment.line_styles[order],
-                        linewidth=2,
-                        label=f"{order.capitalize()} Order")
-            
-            plt.title(f"{algo.name} Performance\n{ylabel}", pad=20)
-            plt.xlabel("List Size (elements)", fontsize=12)
-            plt.ylabel(ylabel, fontsize=12)
-            plt.legend(fontsize=10, framealpha=0.9)
-            plt.grid(True, alpha=0.3)
-            filename = f"individual_{algo.name.lower().replace(' ', '_')}_{metric}_{timestamp}.png"
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
-            logging.info(f"Saved graph: {filename}")
-            plt.close()
+def render_figure(spec, directory='.'):
+    # Imported here so runs that render no figures never load matplotlib
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    for line in spec['lines']:
+        ax.plot(line['x'], line['y'], color=line['color'], linestyle=line['linestyle'],
+                linewidth=2, label=line['label'])
+    if spec['log']:
+        ax.set_yscale('log')
+    ax.set_title(spec['title'], pad=20)
+    ax.set_xlabel("List Size (elements)", fontsize=12)
+    ax.set_ylabel(spec['ylabel'], fontsize=12)
+    ax.legend(fontsize=10, framealpha=0.9)
+    ax.grid(True, which="both" if spec['log'] else "major", alpha=0.3)
+    path = os.path.join(directory, spec['filename'])
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    return path
 
-            plt.figure(figsize=(10, 6))
-            for order in experiment.orders:
-                sizes = []
-                values = []
-                for size in experiment.small_sizes:
-                    key = f"{order}_{size}_small"
-                    if key in experiment.results[algo.name]:
-                        sizes.append(size)
-                        values.append(sum(experiment.results[algo.name][key][metric])/len(experiment.results[algo.name][key][metric]))
-                plt.plot(sizes, values, 
-                        linestyle=experiment.line_styles[order],
-                        linewidth=2,
-                        label=f"{order.capitalize()} Order")
-            
-            plt.title(f"{algo.name} Performance (Small Lists)\n{ylabel}", pad=20)
-            plt.xlabel("List Size (elements)", fontsize=12)
-            plt.ylabel(ylabel, fontsize=12)
-            plt.legend(fontsize=10, framealpha=0.9)
-            plt.grid(True, alpha=0.3)
-            filename = f"individual_{algo.name.lower().replace(' ', '_')}_{metric}_small_{timestamp}.png"
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
-            logging.info(f"Saved graph: {filename}")
-            plt.close()
+def render_figures(specs, directory='.', workers=1, cache=False):
+    # With cache=True a figure is skipped when its spec (and this renderer)
+    # is unchanged since the last render into the same directory
+    cache_path = os.path.join(directory, FIGURE_CACHE)
+    renderer = inspect.getsource(render_figure)
+    rendered = {}
+    if cache and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            rendered = json.load(f)
+    pending = []
+    for spec in specs:
+        digest = fingerprint({'spec': spec, 'renderer': renderer})
+        if cache and rendered.get(spec['filename']) == digest and os.path.exists(os.path.join(directory, spec['filename'])):
+            continue
+        pending.append((spec, digest))
+    logging.info(f"Rendering {len(pending)} of {len(specs)} graphs")
+    if workers == 1:
+        paths = [render_figure(spec, directory) for spec, _ in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = list(pool.map(render_figure, [spec for spec, _ in pending], [directory] * len(pending)))
+    for path, (spec, digest) in zip(paths, pending):
+        rendered[spec['filename']] = digest
+        logging.info(f"Saved graph: {path}")
+    if cache:
+        with open(cache_path, 'w') as f:
+            json.dump(rendered, f, indent=2, sort_keys=True)
+    return paths
 
-def plot_special_cases(experiment, timestamp):
-    logging.info("Generating special case graphs")
-    plt.figure(figsize=(10, 6))
-    for order in ['ascending', 'descending']:
-        sizes = []
-        values = []
-        for size in experiment.large_sizes:
-            key = f"{order}_{size}"
-            if key in experiment.results['Insertion Sort']:
-                sizes.append(size)
-                values.append(sum(experiment.results['Insertion Sort'][key]['time'])/len(experiment.results['Insertion Sort'][key]['time']))
-        plt.plot(sizes, values, 
-                linestyle=experiment.line_styles[order],
-                linewidth=2,
-                label=f"{order.capitalize()} Order")
-    
-    plt.title("Insertion Sort: Best vs Worst Case\nTime (ms)", pad=20)
-    plt.xlabel("List Size (elements)", fontsize=12)
-    plt.ylabel("Time (ms)", fontsize=12)
-    plt.legend(fontsize=10, framealpha=0.9)
-    plt.grid(True, alpha=0.3)
-    filename = f"special_insertion_sort_best_worst_{timestamp}.png"
-    plt.savefig(filename, dpi=150, bbox_inches='tight')
-    logging.info(f"Saved graph: {filename}")
-    plt.close()
+def plot_comparison_graphs(experiment, timestamp, directory='.'):
+    logging.info("Generating comparison graphs")
+    render_figures(comparison_figures(experiment, timestamp), directory)
 
-    plt.figure(figsize=(10, 6))
-    for order in ['random', 'ascending']:
-        sizes = []
-        values = []
-        for size in experiment.large_sizes:
-            key = f"{order}_{size}"
-            if key in experiment.results['Quick Sort']:
-                sizes.append(size)
-                values.append(sum(experiment.results['Quick Sort'][key]['time'])/len(experiment.results['Quick Sort'][key]['time']))
-        plt.plot(sizes, values, 
-                linestyle=experiment.line_styles[order],
-                linewidth=2,
-                label=f"{order.capitalize()} Order")
-    
-    plt.title("Quick Sort: Pivot Impact\nTime (ms)", pad=20)
-    plt.xlabel("List Size (elements)", fontsize=12)
-    plt.ylabel("Time (ms)", fontsize=12)
-    plt.legend(fontsize=10, framealpha=0.9)
-    plt.grid(True, alpha=0.3)
-    filename = f"special_quick_sort_pivot_impact_{timestamp}.png"
-    plt.savefig(filename, dpi=150, bbox_inches='tight')
-    logging.info(f"Saved graph: {filename}")
-    plt.close()
+def plot_individual_algorithm_graphs(experiment, timestamp, directory='.'):
+    logging.info("Generating individual algorithm graphs")
+    render_figures(individual_figures(experiment, timestamp), directory)
 
-    plt.figure(figsize=(10, 6))
-    for order in experiment.orders:
-        sizes = []
-        values = []
-        for size in experiment.large_sizes:
-            key = f"{order}_{size}"
-            if key in experiment.results['Merge Sort']:
-                sizes.append(size)
-                values.append(sum(experiment.results['Merge Sort'][key]['time'])/len(experiment.results['Merge Sort'][key]['time']))
-        plt.plot(sizes, values, 
-                linestyle=experiment.line_styles[order],
-                linewidth=2,
-                label=f"{order.capitalize()} Order")
-    
-    plt.title("Merge Sort: Consistency\nTime (ms)", pad=20)
-    plt.xlabel("List Size (elements)", fontsize=12)
-    plt.ylabel("Time (ms)", fontsize=12)
-    plt.legend(fontsize=10, framealpha=0.9)
-    plt.grid(True, alpha=0.3)
-    filename = f"special_merge_sort_consistency_{timestamp}.png"
-    plt.savefig(filename, dpi=150, bbox_inches='tight')
-    logging.info(f"Saved graph: {filename}")
-    plt.close()
\ No newline at end of file
+def plot_special_cases(experiment, timestamp, directory='.'):
+    logging.info("Generating special case graphs")
+    render_figures(special_case_figures(experiment, timestamp), directory)
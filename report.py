@@ -0,0 +1,50 @@
+import os
+import argparse
+from experiment import COLORS, line_styles
+from plotting import comparison_figures, individual_figures, special_case_figures, render_figures
+from results_store import ResultStore
+from utils import setup_logging
+
+class StoredResults:
+    # Read-only stand-in for SortingExperiment built from a result store; it
+    # carries the attributes the figure builders read. When a cell was stored
+    # more than once, the most recent record wins.
+    def __init__(self, path):
+        self.results = {}
+        self.orders = []
+        large_sizes = set()
+        small_sizes = set()
+        for record in ResultStore(path).load().values():
+            key = record['key']
+            if key.endswith(('_huge', '_stream', '_scaling')):
+                # Out-of-core, batch-arrival and scaling cells are reported in the numerical results only
+                continue
+            small = key.endswith('_small')
+            order, size = key[:-len('_small')].rsplit('_', 1) if small else key.rsplit('_', 1)
+            (small_sizes if small else large_sizes).add(int(size))
+            if order not in self.orders:
+                self.orders.append(order)
+            self.results.setdefault(record['algorithm'], {})[key] = record['result']
+        self.large_sizes = sorted(large_sizes)
+        self.small_sizes = sorted(small_sizes)
+        self.colors = dict(COLORS)
+        self.line_styles = line_styles(self.orders)
+
+def build_report(path, directory='figures', workers=None, cache=True):
+    stored = StoredResults(path)
+    os.makedirs(directory, exist_ok=True)
+    specs = comparison_figures(stored) + individual_figures(stored) + special_case_figures(stored)
+    return render_figures(specs, directory, workers=workers or os.cpu_count() or 1, cache=cache)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render graphs from a stored experiment run")
+    parser.add_argument('store', nargs='?', default='results.jsonl', help="JSON Lines result store")
+    parser.add_argument('--out', default='figures', help="output directory for the PNG files")
+    parser.add_argument('--workers', type=int, default=None, help="rendering processes (default: all CPUs)")
+    parser.add_argument('--force', action='store_true', help="re-render graphs even if their inputs are unchanged")
+    args = parser.parse_args()
+    setup_logging()
+    build_report(args.store, args.out, args.workers, cache=not args.force)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import sys
+import logging
+import statistics
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+REPRESENTATIONS = ['list', 'array', 'numpy']
+
+def convert(data, representation):
+    if representation == 'list':
+        return list(data)
+    floats = any(isinstance(x, float) for x in data)
+    if representation == 'array':
+        if not all(isinstance(x, (int, float)) for x in data):
+            raise ValueError("The array representation only holds numbers")
+        return array('d' if floats else 'q', data)
+    if representation == 'numpy':
+        if np is None:
+            raise ImportError("The numpy representation requires numpy (pip install numpy)")
+        if floats or not all(isinstance(x, int) for x in data):
+            return np.asarray(data)
+        return np.asarray(data, dtype=np.int64)
+    raise ValueError(f"Unknown representation: {representation}")
+
+def bytes_per_element(arr):
+    n = len(arr)
+    if n == 0:
+        return 0.0
+    if isinstance(arr, array):
+        return sys.getsizeof(arr) / n
+    if np is not None and isinstance(arr, np.ndarray):
+        return (sys.getsizeof(arr) if arr.base is None else arr.nbytes) / n
+    # A list holds pointers to boxed ints; count each distinct int object once
+    objects = {id(x): x for x in arr}
+    return (sys.getsizeof(arr) + sum(sys.getsizeof(x) for x in objects.values())) / n
+
+def log_representation_overhead(experiments):
+    # Compares runs of the same grid that differ only in their representation;
+    # the time ratio against the list run is the cost of the representation,
+    # the list time itself is the cost of the algorithm.
+    by_representation = {experiment.representation: experiment for experiment in experiments}
+    baseline = by_representation.get('list')
+    logging.info("\nRepresentation Overhead (largest size per order):")
+    logging.info(f"{'Algorithm':<45} {'Order':<12} {'Repr':<8} {'Avg Time (ms)':<15} {'vs List':<10} {'Bytes/Elem':<10}")
+    for experiment in experiments:
+        for algo in experiment.algorithms:
+            for order in experiment.orders:
+                key = experiment.result_key(order, experiment.large_sizes[-1])
+                cell = experiment.results[algo.name].get(key)
+                if not cell or not cell['time']:
+                    continue
+                avg_time = statistics.mean(cell['time'])
+                ratio = ''
+                if baseline is not None and cell is not baseline.results.get(algo.name, {}).get(key):
+                    base_cell = baseline.results.get(algo.name, {}).get(key)
+                    if base_cell and base_cell['time']:
+                        ratio = f"{avg_time / statistics.mean(base_cell['time']):.2f}x"
+                logging.info(f"{algo.name:<45} {order:<12} {experiment.representation:<8} {avg_time:<15.2f} {ratio:<10} {cell.get('bytes_per_element', 0.0):<10.1f}")
@@ -0,0 +1,83 @@
+import os
+import json
+import zlib
+import inspect
+import logging
+import platform
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+    }
+
+def fingerprint(data):
+    return format(zlib.crc32(json.dumps(data, sort_keys=True).encode()), '08x')
+
+def algorithm_version(algo):
+    # Any edit to the modules defining the engine's classes and those of the
+    # engines it delegates to, including the helpers they call outside their
+    # own class, or to its configuration invalidates the cells stored for it
+    sources = {}
+    pending = [algo]
+    while pending:
+        engine = pending.pop()
+        for cls in type(engine).__mro__:
+            module = inspect.getmodule(cls)
+            if module is not None and module.__name__ not in sources and module.__name__ != 'builtins':
+                sources[module.__name__] = inspect.getsource(module)
+        pending.extend(engine.dependencies())
+    return fingerprint({'source': sources, 'config': algo.config()})
+
+class ResultStore:
+    # Append-only JSON Lines file with one record per completed cell. A line
+    # cut short by an interrupted run is skipped when the store is loaded.
+    def __init__(self, path):
+        self.path = path
+        self.environment = environment()
+        self.environment_id = fingerprint(self.environment)
+
+    def cell_id(self, algo_name, version, key, params):
+        return f"{self.environment_id}|{algo_name}|{version}|{key}|{fingerprint(params)}"
+
+    def load(self):
+        cells = {}
+        if not os.path.exists(self.path):
+            return cells
+        with open(self.path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping unreadable record on line {line_number} of {self.path}")
+                    continue
+                cells[record['cell']] = record
+        return cells
+
+    def append(self, cell, algo_name, version, key, params, result):
+        record = {
+            'cell': cell,
+            'environment_id': self.environment_id,
+            'environment': self.environment,
+            'algorithm': algo_name,
+            'version': version,
+            'key': key,
+            'params': params,
+            'result': result,
+        }
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,354 @@
+import os
+import sys
+import signal
+import json
+import inspect
+import threading
+import math
+import time
+import struct
+import asyncio
+import logging
+import argparse
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from sorting_algorithms import ALGORITHMS, pool_context
+from utils import setup_logging
+
+# Binary framing, all integers little-endian. A request is a header
+# (job id, element count, algorithm name length, options length), the UTF-8
+# algorithm name, the options as JSON (constructor arguments of the engine)
+# and the payload as count native int64 values. A response is a header
+# (job id, status, body length) and the body: the sorted int64 values, an
+# error message or, for the STATS_JOB pseudo algorithm, a JSON document.
+# Payloads travel as raw buffers end to end: they are read with one
+# readexactly, cast with memoryview and written back with one write.
+REQUEST_HEADER = struct.Struct('<IIHH')
+RESPONSE_HEADER = struct.Struct('<IBI')
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_STATS = 2
+STATS_JOB = '!stats'
+ITEM_SIZE = array('q').itemsize
+DEFAULT_PORT = 8765
+
+MAX_ENGINES = 64
+
+_ENGINES = OrderedDict()
+_ENGINES_LOCK = threading.Lock()
+
+def engine_options(name, options):
+    # Client options may only set constructor arguments of the engine (not
+    # the paths of files it reads) and are re-encoded with sorted keys, so
+    # equal configurations share one cached engine
+    options = json.loads(options or '{}')
+    if not isinstance(options, dict):
+        raise ValueError("Engine options must be a JSON object")
+    allowed = set(inspect.signature(ALGORITHMS[name]).parameters) - {'path'}
+    unknown = set(options) - allowed
+    if unknown:
+        raise ValueError(f"Unknown options for {name}: {', '.join(sorted(unknown))}")
+    return json.dumps(options, sort_keys=True) if options else ''
+
+def _engine(name, options):
+    # Engines are built once per process and configuration; beyond
+    # MAX_ENGINES the least recently used one is closed
+    key = (name, options)
+    with _ENGINES_LOCK:
+        if key in _ENGINES:
+            _ENGINES.move_to_end(key)
+            return _ENGINES[key]
+        engine = _ENGINES[key] = ALGORITHMS[name](**json.loads(options or '{}'))
+        if len(_ENGINES) > MAX_ENGINES:
+            _ENGINES.popitem(last=False)[1].close()
+    return engine
+
+def _sort_job(name, options, payload):
+    try:
+        data = memoryview(payload).cast('q').tolist()
+        return STATUS_OK, array('q', _engine(name, options).sort(data)).tobytes()
+    except Exception as e:
+        return STATUS_ERROR, f"{type(e).__name__}: {e}".encode()
+
+def _sort_batch(jobs):
+    return [_sort_job(*job) for job in jobs]
+
+class LatencyHistogram:
+    # Log-linear buckets, SUB_BUCKETS per power of two of microseconds, so a
+    # percentile is reported within about 9% at any latency and recording is O(1)
+    SUB_BUCKETS = 8
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        index = int(math.log2(max(1.0, seconds * 1e6)) * self.SUB_BUCKETS)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile, in ms
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / self.SUB_BUCKETS) / 1000, self.max * 1000)
+        return 0.0
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max * 1000,
+        }
+
+class SortService:
+    # Jobs of at most small_threshold elements are collected for up to
+    # batch_window seconds (or max_batch jobs) and sent to the pool as one
+    # task, which amortizes the per-task IPC cost; larger jobs go to the
+    # pool one by one. Engines with a pool of their own (the parallel sorts)
+    # run from the service process on a thread, since a pool nested in one
+    # of our workers keeps that worker from exiting.
+    def __init__(self, workers=None, small_threshold=4096, batch_window=0.002, max_batch=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.small_threshold = small_threshold
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.pool = None
+        self.queue = None
+        self.started = time.perf_counter()
+        self.latency = {'batched': LatencyHistogram(), 'pool': LatencyHistogram(), 'parallel': LatencyHistogram()}
+        self.counters = {'jobs': 0, 'errors': 0, 'elements': 0, 'bytes_in': 0, 'bytes_out': 0, 'batches': 0}
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+        loop = asyncio.get_running_loop()
+        # Start the workers before the first job arrives
+        await asyncio.gather(*(loop.run_in_executor(self.pool, abs, 0) for _ in range(self.workers)))
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.ensure_future(self._batch_loop())
+
+    def close(self):
+        self.batcher.cancel()
+        self.pool.shutdown()
+        for engine in _ENGINES.values():
+            engine.close()
+
+    def stats(self):
+        uptime = time.perf_counter() - self.started
+        stats = dict(self.counters)
+        stats['uptime'] = uptime
+        stats['jobs_per_second'] = self.counters['jobs'] / uptime
+        stats['elements_per_second'] = self.counters['elements'] / uptime
+        stats['latency'] = {path: histogram.summary() for path, histogram in self.latency.items()}
+        return stats
+
+    async def handle(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                job_id, count, name_len, options_len = REQUEST_HEADER.unpack(header)
+                name = (await reader.readexactly(name_len)).decode()
+                options = (await reader.readexactly(options_len)).decode()
+                payload = await reader.readexactly(count * ITEM_SIZE)
+                task = asyncio.ensure_future(self._serve(writer, job_id, name, options, payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def _serve(self, writer, job_id, name, options, payload):
+        if name == STATS_JOB:
+            body = json.dumps(self.stats()).encode()
+            writer.write(RESPONSE_HEADER.pack(job_id, STATUS_STATS, len(body)) + body)
+            await writer.drain()
+            return
+        start_time = time.perf_counter()
+        count = len(payload) // ITEM_SIZE
+        loop = asyncio.get_running_loop()
+        path = 'batched' if count <= self.small_threshold else 'pool'
+        error = None
+        if name not in ALGORITHMS:
+            error = f"Unknown algorithm: {name}"
+        else:
+            try:
+                options = engine_options(name, options)
+            except ValueError as e:
+                error = f"{type(e).__name__}: {e}"
+        if error is not None:
+            status, body = STATUS_ERROR, error.encode()
+        elif self._multiprocess(name, options):
+            path = 'parallel'
+            status, body = await loop.run_in_executor(None, _sort_job, name, options, payload)
+        elif path == 'batched':
+            future = loop.create_future()
+            await self.queue.put(((name, options, payload), future))
+            status, body = await future
+        else:
+            status, body = await loop.run_in_executor(self.pool, _sort_job, name, options, payload)
+        self.latency[path].record(time.perf_counter() - start_time)
+        self.counters['jobs'] += 1
+        self.counters['errors'] += status != STATUS_OK
+        self.counters['elements'] += count
+        self.counters['bytes_in'] += len(payload)
+        self.counters['bytes_out'] += len(body)
+        writer.write(RESPONSE_HEADER.pack(job_id, status, len(body)))
+        writer.write(body)
+        await writer.drain()
+
+    def _multiprocess(self, name, options):
+        try:
+            engine = _engine(name, options)
+        except Exception:
+            # Bad options are reported by the worker that runs the job
+            return False
+        if engine.multiprocess and engine.pool is None:
+            # Start the engine's pool here, before jobs reach it from several threads
+            engine.configure_for('random')
+        return engine.multiprocess
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.counters['batches'] += 1
+            results = loop.run_in_executor(self.pool, _sort_batch, [job for job, _ in batch])
+            asyncio.ensure_future(self._finish_batch(batch, results))
+
+    async def _finish_batch(self, batch, results):
+        try:
+            results = await results
+        except Exception as e:
+            results = [(STATUS_ERROR, f"{type(e).__name__}: {e}".encode())] * len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+class SortClient:
+    # Pipelined client: requests are written as they are made and responses
+    # are matched to them by job id, so one connection can carry many jobs
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = 0
+        self.reader_task = asyncio.ensure_future(self._read_responses())
+
+    @classmethod
+    async def connect(cls, path=None, host='127.0.0.1', port=DEFAULT_PORT):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, algorithm, payload=b'', options=None):
+        job_id = self.next_id
+        self.next_id = (self.next_id + 1) % 2 ** 32
+        future = asyncio.get_running_loop().create_future()
+        self.pending[job_id] = future
+        name = algorithm.encode()
+        encoded_options = json.dumps(options).encode() if options else b''
+        self.writer.write(REQUEST_HEADER.pack(job_id, len(payload) // ITEM_SIZE, len(name), len(encoded_options))
+                          + name + encoded_options)
+        self.writer.write(payload)
+        await self.writer.drain()
+        return await future
+
+    async def sort(self, data, algorithm='Tim Sort', options=None):
+        payload = data if isinstance(data, (bytes, bytearray, memoryview)) else array('q', data).tobytes()
+        status, body = await self.request(algorithm, payload, options)
+        if status != STATUS_OK:
+            raise RuntimeError(body.decode())
+        result = array('q')
+        result.frombytes(body)
+        return result
+
+    async def stats(self):
+        _, body = await self.request(STATS_JOB)
+        return json.loads(body)
+
+    async def _read_responses(self):
+        try:
+            while True:
+                header = await self.reader.readexactly(RESPONSE_HEADER.size)
+                job_id, status, length = RESPONSE_HEADER.unpack(header)
+                body = await self.reader.readexactly(length)
+                self.pending.pop(job_id).set_result((status, body))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Connection closed: {e}"))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.reader_task.cancel()
+
+async def serve(service, path=None, host='127.0.0.1', port=DEFAULT_PORT, stats_interval=10.0):
+    if os.name == 'posix':
+        # SIGTERM stops the service like Ctrl+C, so the pool is shut down
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    await service.start()
+    if path:
+        server = await asyncio.start_unix_server(service.handle, path)
+        logging.info(f"Sort service listening on {path}")
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        logging.info(f"Sort service listening on {host}:{port}")
+    try:
+        async with server:
+            while True:
+                await asyncio.sleep(stats_interval)
+                stats = service.stats()
+                latency = ', '.join(f"{kind} p50 {summary['p50_ms']:.2f} ms p99 {summary['p99_ms']:.2f} ms"
+                                    for kind, summary in stats['latency'].items() if summary['count'])
+                logging.info(f"{stats['jobs']} jobs, {stats['jobs_per_second']:.1f} jobs/s, "
+                             f"{stats['elements_per_second']:.0f} elements/s{', ' + latency if latency else ''}")
+    finally:
+        service.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sorting engines over a Unix socket or TCP")
+    parser.add_argument('--unix', help="Unix socket path (default: TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="pool processes (default: all CPUs)")
+    parser.add_argument('--small-threshold', type=int, default=4096, help="largest job that is micro-batched")
+    parser.add_argument('--batch-window-ms', type=float, default=2.0, help="how long a micro-batch collects jobs")
+    parser.add_argument('--max-batch', type=int, default=64, help="most jobs per micro-batch")
+    parser.add_argument('--stats-interval', type=float, default=10.0, help="seconds between stats log lines")
+    args = parser.parse_args()
+    setup_logging()
+    service = SortService(args.workers, args.small_threshold, args.batch_window_ms / 1000, args.max_batch)
+    try:
+        asyncio.run(serve(service, args.unix, args.host, args.port, args.stats_interval))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
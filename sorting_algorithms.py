@@ -1,94 +1,166 @@
 import sys
+import json
+import os
+import math
+import random
+import heapq
+from array import array
+from bisect import bisect_right
+from copy import copy
+from contextlib import contextmanager
+from functools import partial
+from itertools import repeat
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context, resource_tracker, shared_memory
 
-# Increase recursion limit for large lists
-sys.setrecursionlimit(50000)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RECURSION_LIMIT = 50000
+
+@contextmanager
+def recursion_limit(limit=RECURSION_LIMIT):
+    # Raised only while a recursive engine runs, not for the whole process
+    previous = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(previous, limit))
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
+
+def slices_are_views(arr):
+    return np is not None and isinstance(arr, np.ndarray)
+
+class ComparisonCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+class CountingKey:
+    # Element wrapper that counts every rich comparison it takes part in, so
+    # each engine needs only one implementation for timing and counting
+    __slots__ = ('value', 'counter')
+
+    def __init__(self, value, counter):
+        self.value = value
+        self.counter = counter
+
+    def __lt__(self, other):
+        self.counter.count += 1
+        return self.value < other.value
+
+    def __le__(self, other):
+        self.counter.count += 1
+        return self.value <= other.value
+
+    def __gt__(self, other):
+        self.counter.count += 1
+        return self.value > other.value
+
+    def __ge__(self, other):
+        self.counter.count += 1
+        return self.value >= other.value
+
+    def __eq__(self, other):
+        self.counter.count += 1
+        return self.value == other.value
+
+    def __ne__(self, other):
+        self.counter.count += 1
+        return self.value != other.value
+
+    __hash__ = None
 
 class SortingAlgorithm(ABC):
+    # Element types the engine can sort; None means anything comparable
+    key_types = None
+    comparison_sort = True
+    # Engines that start worker processes of their own are run from the
+    # parent process, never inside the experiment's process pool
+    multiprocess = False
+
     def __init__(self):
         self.comparisons = 0
 
+    # sort() may reorder its argument in place and returns the sorted
+    # sequence; the benchmark harness hands it a copy made off the clock
     @abstractmethod
-    def sort_timing(self, arr):
+    def sort(self, arr):
         pass
 
-    @abstractmethod
+    def sort_timing(self, arr):
+        return self.sort(copy(arr))
+
     def sort_counting(self, arr):
-        pass
+        counter = ComparisonCounter()
+        result = self.sort([CountingKey(x, counter) for x in arr])
+        self.comparisons = counter.count
+        return [key.value for key in result]
 
     def reset_comparisons(self):
         self.comparisons = 0
 
+    def configure_for(self, order):
+        pass
+
+    # Converts the input to the form sort() works on; called off the clock
+    def prepare(self, arr):
+        return arr
+
+    def config(self):
+        return {}
+
+    def counters(self):
+        return {}
+
+    # Other engines this one delegates to; their sources count towards
+    # its version in the result store
+    def dependencies(self):
+        return []
+
+    def close(self):
+        pass
+
 class InsertionSort(SortingAlgorithm):
     name = "Insertion Sort"
 
-    def sort_timing(self, arr):
-        arr_copy = arr.copy()
-        for i in range(1, len(arr_copy)):
-            key = arr_copy[i]
-            j = i - 1
-            while j >= 0 and arr_copy[j] > key:
-                arr_copy[j + 1] = arr_copy[j]
-                j -= 1
-            arr_copy[j + 1] = key
-        return arr_copy
+    def sort(self, arr):
+        self._insertion_sort(arr, 0, len(arr) - 1)
+        return arr
 
-    def sort_counting(self, arr):
-        arr_copy = arr.copy()
-        self.comparisons = 0
-        for i in range(1, len(arr_copy)):
-            key = arr_copy[i]
+    # The range form is shared with the hybrid sorts below
+    @staticmethod
+    def _insertion_sort(arr, low, high):
+        for i in range(low + 1, high + 1):
+            key = arr[i]
             j = i - 1
-            while j >= 0 and arr_copy[j] > key:
-                self.comparisons += 1
-                arr_copy[j + 1] = arr_copy[j]
+            while j >= low and arr[j] > key:
+                arr[j + 1] = arr[j]
                 j -= 1
-            if j >= 0:
-                self.comparisons += 1
-            arr_copy[j + 1] = key
-        return arr_copy
+            arr[j + 1] = key
 
 class QuickSort(SortingAlgorithm):
     name = "Quick Sort"
 
-    def sort_timing(self, arr):
-        arr_copy = arr.copy()
-        self._quick_sort_timing(arr_copy, 0, len(arr_copy) - 1)
-        return arr_copy
-
-    def sort_counting(self, arr):
-        arr_copy = arr.copy()
-        self.comparisons = 0
-        self._quick_sort_counting(arr_copy, 0, len(arr_copy) - 1)
-        return arr_copy
-
-    def _quick_sort_timing(self, arr, low, high):
-        if low < high:
-            pi = self._partition_timing(arr, low, high)
-            self._quick_sort_timing(arr, low, pi - 1)
-            self._quick_sort_timing(arr, pi + 1, high)
-
-    def _partition_timing(self, arr, low, high):
-        pivot = arr[high]
-        i = low - 1
-        for j in range(low, high):
-            if arr[j] <= pivot:
-                i += 1
-                arr[i], arr[j] = arr[j], arr[i]
-        arr[i + 1], arr[high] = arr[high], arr[i + 1]
-        return i + 1
+    def sort(self, arr):
+        with recursion_limit():
+            self._quick_sort(arr, 0, len(arr) - 1)
+        return arr
 
-    def _quick_sort_counting(self, arr, low, high):
+    def _quick_sort(self, arr, low, high):
         if low < high:
-            pi = self._partition_counting(arr, low, high)
-            self._quick_sort_counting(arr, low, pi - 1)
-            self._quick_sort_counting(arr, pi + 1, high)
+            pi = self._partition(arr, low, high)
+            self._quick_sort(arr, low, pi - 1)
+            self._quick_sort(arr, pi + 1, high)
 
-    def _partition_counting(self, arr, low, high):
+    def _partition(self, arr, low, high):
         pivot = arr[high]
         i = low - 1
         for j in range(low, high):
-            self.comparisons += 1  
             if arr[j] <= pivot:
                 i += 1
                 arr[i], arr[j] = arr[j], arr[i]
@@ -98,27 +170,26 @@ class QuickSort(SortingAlgorithm):
 class MergeSort(SortingAlgorithm):
     name = "Merge Sort"
 
-    def sort_timing(self, arr):
-        arr_copy = arr.copy()
-        self._merge_sort_timing(arr_copy, 0, len(arr_copy) - 1)
-        return arr_copy
+    # NumPy slices are views, so the merge halves have to be copied explicitly
+    def sort(self, arr):
+        self.copy_halves = slices_are_views(arr)
+        with recursion_limit():
+            self._merge_sort(arr, 0, len(arr) - 1)
+        return arr
 
-    def sort_counting(self, arr):
-        arr_copy = arr.copy()
-        self.comparisons = 0
-        self._merge_sort_counting(arr_copy, 0, len(arr_copy) - 1)
-        return arr_copy
-
-    def _merge_sort_timing(self, arr, left, right):
+    def _merge_sort(self, arr, left, right):
         if left < right:
             mid = (left + right) // 2
-            self._merge_sort_timing(arr, left, mid)
-            self._merge_sort_timing(arr, mid + 1, right)
-            self._merge_timing(arr, left, mid, right)
+            self._merge_sort(arr, left, mid)
+            self._merge_sort(arr, mid + 1, right)
+            self._merge(arr, left, mid, right)
 
-    def _merge_timing(self, arr, left, mid, right):
+    def _merge(self, arr, left, mid, right):
         left_half = arr[left:mid + 1]
         right_half = arr[mid + 1:right + 1]
+        if self.copy_halves:
+            left_half = left_half.copy()
+            right_half = right_half.copy()
         i = j = 0
         k = left
         while i < len(left_half) and j < len(right_half):
@@ -138,32 +209,992 @@ class MergeSort(SortingAlgorithm):
             j += 1
             k += 1
 
-    def _merge_sort_counting(self, arr, left, right):
-        if left < right:
-            mid = (left + right) // 2
-            self._merge_sort_counting(arr, left, mid)
-            self._merge_sort_counting(arr, mid + 1, right)
-            self._merge_counting(arr, left, mid, right)
+class IterativeQuickSort(QuickSort):
+    name = "Iterative Quick Sort"
 
-    def _merge_counting(self, arr, left, mid, right):
-        left_half = arr[left:mid + 1]
-        right_half = arr[mid + 1:right + 1]
-        i = j = 0
+    def sort(self, arr):
+        self._quick_sort(arr, 0, len(arr) - 1)
+        return arr
+
+    # Smaller partition is handled first and the larger one deferred on an
+    # explicit stack, which bounds the stack at O(log n) entries.
+    def _quick_sort(self, arr, low, high):
+        stack = []
+        while True:
+            while low < high:
+                pi = self._partition(arr, low, high)
+                if pi - low < high - pi:
+                    stack.append((pi + 1, high))
+                    high = pi - 1
+                else:
+                    stack.append((low, pi - 1))
+                    low = pi + 1
+            if not stack:
+                return
+            low, high = stack.pop()
+
+    # Median of three moved to the end, so sorted and reverse sorted input
+    # split evenly instead of degrading to O(n^2)
+    def _partition(self, arr, low, high):
+        mid = (low + high) // 2
+        if arr[mid] < arr[low]:
+            arr[low], arr[mid] = arr[mid], arr[low]
+        if arr[high] < arr[low]:
+            arr[low], arr[high] = arr[high], arr[low]
+        if arr[mid] < arr[high]:
+            arr[mid], arr[high] = arr[high], arr[mid]
+        return super()._partition(arr, low, high)
+
+class BottomUpMergeSort(MergeSort):
+    name = "Bottom-Up Merge Sort"
+
+    def sort(self, arr):
+        self.copy_halves = slices_are_views(arr)
+        self._merge_sort(arr, 0, len(arr) - 1)
+        return arr
+
+    def _merge_sort(self, arr, left, right):
+        n = right - left + 1
+        width = 1
+        while width < n:
+            for lo in range(left, right + 1 - width, 2 * width):
+                mid = lo + width - 1
+                self._merge(arr, lo, mid, min(lo + 2 * width - 1, right))
+            width *= 2
+
+class BufferedMergeSort(SortingAlgorithm):
+    name = "Buffered Merge Sort"
+
+    # One auxiliary list is allocated per sort; each level merges from src
+    # into dst and the two swap roles, instead of slicing on every merge.
+    # Copies are element-wise so no temporary slice lists are created.
+    def sort(self, arr):
+        src = arr
+        dst = copy(src)
+        n = len(src)
+        width = 1
+        while width < n:
+            for lo in range(0, n, 2 * width):
+                mid = min(lo + width, n) - 1
+                hi = min(lo + 2 * width, n) - 1
+                if mid >= hi or src[mid] <= src[mid + 1]:
+                    for k in range(lo, hi + 1):
+                        dst[k] = src[k]
+                else:
+                    self._merge(src, dst, lo, mid, hi)
+            src, dst = dst, src
+            width *= 2
+        return src
+
+    def _merge(self, src, dst, left, mid, right):
+        i = left
+        j = mid + 1
         k = left
-        while i < len(left_half) and j < len(right_half):
-            self.comparisons += 1
-            if left_half[i] <= right_half[j]:
-                arr[k] = left_half[i]
+        while i <= mid and j <= right:
+            if src[i] <= src[j]:
+                dst[k] = src[i]
                 i += 1
             else:
-                arr[k] = right_half[j]
+                dst[k] = src[j]
                 j += 1
             k += 1
-        while i < len(left_half):
-            arr[k] = left_half[i]
+        while i <= mid:
+            dst[k] = src[i]
             i += 1
             k += 1
-        while j < len(right_half):
-            arr[k] = right_half[j]
+        while j <= right:
+            dst[k] = src[j]
             j += 1
-            k += 1
\ No newline at end of file
+            k += 1
+
+def _gallop_left(key, arr, base, n, hint):
+    # Number of elements of arr[base:base + n] that are < key, searched by
+    # doubling steps away from hint and then a binary search
+    last_ofs = 0
+    ofs = 1
+    if arr[base + hint] < key:
+        max_ofs = n - hint
+        while ofs < max_ofs and arr[base + hint + ofs] < key:
+            last_ofs = ofs
+            ofs = (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs += hint
+        ofs += hint
+    else:
+        max_ofs = hint + 1
+        while ofs < max_ofs and not arr[base + hint - ofs] < key:
+            last_ofs = ofs
+            ofs = (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = hint - ofs, hint - last_ofs
+    last_ofs += 1
+    while last_ofs < ofs:
+        m = last_ofs + ((ofs - last_ofs) >> 1)
+        if arr[base + m] < key:
+            last_ofs = m + 1
+        else:
+            ofs = m
+    return ofs
+
+def _gallop_right(key, arr, base, n, hint):
+    # Number of elements of arr[base:base + n] that are <= key
+    last_ofs = 0
+    ofs = 1
+    if key < arr[base + hint]:
+        max_ofs = hint + 1
+        while ofs < max_ofs and key < arr[base + hint - ofs]:
+            last_ofs = ofs
+            ofs = (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = hint - ofs, hint - last_ofs
+    else:
+        max_ofs = n - hint
+        while ofs < max_ofs and not key < arr[base + hint + ofs]:
+            last_ofs = ofs
+            ofs = (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs += hint
+        ofs += hint
+    last_ofs += 1
+    while last_ofs < ofs:
+        m = last_ofs + ((ofs - last_ofs) >> 1)
+        if key < arr[base + m]:
+            ofs = m
+        else:
+            last_ofs = m + 1
+    return ofs
+
+class TimSort(SortingAlgorithm):
+    name = "Tim Sort"
+    MIN_GALLOP = 7
+
+    # Natural merge sort after CPython's listsort: existing runs (strictly
+    # descending ones reversed) are extended to minrun with binary insertion,
+    # pushed on a stack whose run lengths are kept roughly Fibonacci-like,
+    # and merged with galloping once one side keeps winning. Only < is used.
+    def sort(self, arr):
+        self.copy_halves = slices_are_views(arr)
+        self.min_gallop = self.MIN_GALLOP
+        n = len(arr)
+        min_run = self._min_run(n)
+        runs = []
+        lo = 0
+        while lo < n:
+            run_len = self._count_run(arr, lo, n)
+            if run_len < min_run:
+                force = min(min_run, n - lo)
+                self._binary_insertion_sort(arr, lo, lo + force, lo + run_len)
+                run_len = force
+            runs.append((lo, run_len))
+            self._merge_collapse(arr, runs)
+            lo += run_len
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+            self._merge_at(arr, runs, i)
+        return arr
+
+    @staticmethod
+    def _min_run(n):
+        r = 0
+        while n >= 64:
+            r |= n & 1
+            n >>= 1
+        return n + r
+
+    def _count_run(self, arr, lo, hi):
+        run_hi = lo + 1
+        if run_hi == hi:
+            return 1
+        if arr[run_hi] < arr[lo]:
+            run_hi += 1
+            while run_hi < hi and arr[run_hi] < arr[run_hi - 1]:
+                run_hi += 1
+            i, j = lo, run_hi - 1
+            while i < j:
+                arr[i], arr[j] = arr[j], arr[i]
+                i += 1
+                j -= 1
+        else:
+            run_hi += 1
+            while run_hi < hi and not arr[run_hi] < arr[run_hi - 1]:
+                run_hi += 1
+        return run_hi - lo
+
+    def _binary_insertion_sort(self, arr, lo, hi, start):
+        for i in range(start, hi):
+            pivot = arr[i]
+            left = lo
+            right = i
+            while left < right:
+                mid = (left + right) >> 1
+                if pivot < arr[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            for j in range(i, left, -1):
+                arr[j] = arr[j - 1]
+            arr[left] = pivot
+
+    def _merge_collapse(self, arr, runs):
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                    (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                return
+            self._merge_at(arr, runs, i)
+
+    def _merge_at(self, arr, runs, i):
+        base_a, len_a = runs[i]
+        base_b, len_b = runs[i + 1]
+        runs[i] = (base_a, len_a + len_b)
+        del runs[i + 1]
+        # Elements of A that are <= B[0] and of B that are >= A[-1] are already in place
+        k = _gallop_right(arr[base_b], arr, base_a, len_a, 0)
+        base_a += k
+        len_a -= k
+        if len_a == 0:
+            return
+        len_b = _gallop_left(arr[base_a + len_a - 1], arr, base_b, len_b, len_b - 1)
+        if len_b == 0:
+            return
+        if len_a <= len_b:
+            self._merge_lo(arr, base_a, len_a, base_b, len_b)
+        else:
+            self._merge_hi(arr, base_a, len_a, base_b, len_b)
+
+    def _merge_lo(self, arr, base_a, len_a, base_b, len_b):
+        # A (the shorter run) is copied out and merged left to right
+        tmp = arr[base_a:base_a + len_a]
+        if self.copy_halves:
+            tmp = tmp.copy()
+        a = 0
+        b = base_b
+        dest = base_a
+        arr[dest] = arr[b]
+        dest += 1
+        b += 1
+        len_b -= 1
+        min_gallop = self.min_gallop
+        while len_b and len_a > 1:
+            count_a = count_b = 0
+            while len_b and len_a > 1 and (count_a | count_b) < min_gallop:
+                if arr[b] < tmp[a]:
+                    arr[dest] = arr[b]
+                    dest += 1
+                    b += 1
+                    len_b -= 1
+                    count_b += 1
+                    count_a = 0
+                else:
+                    arr[dest] = tmp[a]
+                    dest += 1
+                    a += 1
+                    len_a -= 1
+                    count_a += 1
+                    count_b = 0
+            if not len_b or len_a <= 1:
+                break
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                count_a = _gallop_right(arr[b], tmp, a, len_a, 0)
+                for k in range(count_a):
+                    arr[dest + k] = tmp[a + k]
+                dest += count_a
+                a += count_a
+                len_a -= count_a
+                if len_a <= 1:
+                    break
+                arr[dest] = arr[b]
+                dest += 1
+                b += 1
+                len_b -= 1
+                if not len_b:
+                    break
+                count_b = _gallop_left(tmp[a], arr, b, len_b, 0)
+                for k in range(count_b):
+                    arr[dest + k] = arr[b + k]
+                dest += count_b
+                b += count_b
+                len_b -= count_b
+                if not len_b:
+                    break
+                arr[dest] = tmp[a]
+                dest += 1
+                a += 1
+                len_a -= 1
+                if len_a <= 1:
+                    break
+                if count_a < self.MIN_GALLOP and count_b < self.MIN_GALLOP:
+                    break
+            if not len_b or len_a <= 1:
+                break
+            min_gallop += 1
+        self.min_gallop = max(1, min_gallop)
+        if not len_b:
+            for k in range(len_a):
+                arr[dest + k] = tmp[a + k]
+        elif len_a == 1:
+            for k in range(len_b):
+                arr[dest + k] = arr[b + k]
+            arr[dest + len_b] = tmp[a]
+
+    def _merge_hi(self, arr, base_a, len_a, base_b, len_b):
+        # B (the shorter run) is copied out and merged right to left
+        tmp = arr[base_b:base_b + len_b]
+        if self.copy_halves:
+            tmp = tmp.copy()
+        a = base_a + len_a - 1
+        b = len_b - 1
+        dest = base_b + len_b - 1
+        arr[dest] = arr[a]
+        dest -= 1
+        a -= 1
+        len_a -= 1
+        min_gallop = self.min_gallop
+        while len_a and len_b > 1:
+            count_a = count_b = 0
+            while len_a and len_b > 1 and (count_a | count_b) < min_gallop:
+                if tmp[b] < arr[a]:
+                    arr[dest] = arr[a]
+                    dest -= 1
+                    a -= 1
+                    len_a -= 1
+                    count_a += 1
+                    count_b = 0
+                else:
+                    arr[dest] = tmp[b]
+                    dest -= 1
+                    b -= 1
+                    len_b -= 1
+                    count_b += 1
+                    count_a = 0
+            if not len_a or len_b <= 1:
+                break
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                count_a = len_a - _gallop_right(tmp[b], arr, base_a, len_a, len_a - 1)
+                for k in range(count_a):
+                    arr[dest - k] = arr[a - k]
+                dest -= count_a
+                a -= count_a
+                len_a -= count_a
+                if not len_a:
+                    break
+                arr[dest] = tmp[b]
+                dest -= 1
+                b -= 1
+                len_b -= 1
+                if len_b <= 1:
+                    break
+                count_b = len_b - _gallop_left(arr[a], tmp, 0, len_b, len_b - 1)
+                for k in range(count_b):
+                    arr[dest - k] = tmp[b - k]
+                dest -= count_b
+                b -= count_b
+                len_b -= count_b
+                if len_b <= 1:
+                    break
+                arr[dest] = arr[a]
+                dest -= 1
+                a -= 1
+                len_a -= 1
+                if not len_a:
+                    break
+                if count_a < self.MIN_GALLOP and count_b < self.MIN_GALLOP:
+                    break
+            if not len_a or len_b <= 1:
+                break
+            min_gallop += 1
+        self.min_gallop = max(1, min_gallop)
+        if not len_a:
+            for k in range(len_b):
+                arr[dest - k] = tmp[b - k]
+        elif len_b == 1:
+            for k in range(len_a):
+                arr[dest - k] = arr[a - k]
+            arr[dest - len_a] = tmp[b]
+
+class BuiltinSort(SortingAlgorithm):
+    name = "Built-in sorted"
+
+    # Reference row: CPython's C implementation of the same algorithm.
+    # It calls only __lt__, so the counting wrapper counts it exactly.
+    def sort(self, arr):
+        return sorted(arr)
+
+CUTOFF_CONFIG = 'hybrid_cutoffs.json'
+DEFAULT_CUTOFF = 16
+
+def load_cutoffs(path=CUTOFF_CONFIG):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_cutoffs(cutoffs, path=CUTOFF_CONFIG):
+    with open(path, 'w') as f:
+        json.dump(cutoffs, f, indent=2, sort_keys=True)
+
+class HybridMixin:
+    # Sub-ranges of at most `cutoff` elements are finished by insertion sort.
+    # Without an explicit cutoff the tuned value for the input order is read
+    # from CUTOFF_CONFIG (see SortingExperiment.tune_cutoffs).
+    def __init__(self, cutoff=None, path=CUTOFF_CONFIG):
+        super().__init__()
+        self.fixed_cutoff = cutoff
+        self.tuned_cutoffs = load_cutoffs(path).get(self.name, {})
+        self.configure_for('random')
+
+    def configure_for(self, order):
+        if self.fixed_cutoff is not None:
+            cutoff = self.fixed_cutoff
+        else:
+            cutoff = self.tuned_cutoffs.get(order, DEFAULT_CUTOFF)
+        self.cutoff = max(1, cutoff)
+
+    def config(self):
+        return {'cutoff': self.fixed_cutoff, 'tuned_cutoffs': self.tuned_cutoffs}
+
+class HybridQuickSort(HybridMixin, IterativeQuickSort):
+    name = "Hybrid Quick Sort"
+
+    def _quick_sort(self, arr, low, high):
+        stack = []
+        cutoff = self.cutoff
+        while True:
+            while high - low >= cutoff:
+                pi = self._partition(arr, low, high)
+                if pi - low < high - pi:
+                    stack.append((pi + 1, high))
+                    high = pi - 1
+                else:
+                    stack.append((low, pi - 1))
+                    low = pi + 1
+            InsertionSort._insertion_sort(arr, low, high)
+            if not stack:
+                return
+            low, high = stack.pop()
+
+class HybridMergeSort(HybridMixin, MergeSort):
+    name = "Hybrid Merge Sort"
+
+    def _merge_sort(self, arr, left, right):
+        if right - left < self.cutoff:
+            InsertionSort._insertion_sort(arr, left, right)
+        else:
+            mid = (left + right) // 2
+            self._merge_sort(arr, left, mid)
+            self._merge_sort(arr, mid + 1, right)
+            self._merge(arr, left, mid, right)
+
+class ConfigurableQuickSort(SortingAlgorithm):
+    pivots = ['last', 'random', 'median3', 'ninther']
+    schemes = ['lomuto', 'hoare', 'three-way']
+
+    def __init__(self, pivot='last', scheme='lomuto', introsort=False, seed=0):
+        super().__init__()
+        if pivot not in self.pivots:
+            raise ValueError(f"Unknown pivot strategy: {pivot}")
+        if scheme not in self.schemes:
+            raise ValueError(f"Unknown partition scheme: {scheme}")
+        self.pivot = pivot
+        self.scheme = scheme
+        self.introsort = introsort
+        self.seed = seed
+        self.name = self.variant_name(pivot, scheme, introsort)
+
+    def config(self):
+        return {'pivot': self.pivot, 'scheme': self.scheme, 'introsort': self.introsort, 'seed': self.seed}
+
+    @staticmethod
+    def variant_name(pivot, scheme, introsort):
+        return f"Quick Sort ({pivot}, {scheme}{', introsort' if introsort else ''})"
+
+    def sort(self, arr):
+        self.rng = random.Random(self.seed)
+        self._quick_sort(arr, 0, len(arr) - 1)
+        return arr
+
+    def _depth_limit(self, n):
+        if not self.introsort:
+            return math.inf
+        return 2 * max(1, n).bit_length()
+
+    # Partitions return the (left_end, right_start) bounds of the two
+    # sub-ranges still to be sorted, so the three schemes share one driver.
+    def _quick_sort(self, arr, low, high):
+        stack = []
+        depth = self._depth_limit(high - low + 1)
+        while True:
+            while low < high:
+                if depth == 0:
+                    self._heap_sort(arr, low, high)
+                    break
+                depth -= 1
+                left_end, right_start = self._partition(arr, low, high)
+                if left_end - low < high - right_start:
+                    stack.append((right_start, high, depth))
+                    high = left_end
+                else:
+                    stack.append((low, left_end, depth))
+                    low = right_start
+            if not stack:
+                return
+            low, high, depth = stack.pop()
+
+    def _partition(self, arr, low, high):
+        p = self._select_pivot(arr, low, high)
+        if self.scheme == 'lomuto':
+            arr[p], arr[high] = arr[high], arr[p]
+            pivot = arr[high]
+            i = low - 1
+            for j in range(low, high):
+                if arr[j] <= pivot:
+                    i += 1
+                    arr[i], arr[j] = arr[j], arr[i]
+            arr[i + 1], arr[high] = arr[high], arr[i + 1]
+            return i, i + 2
+        arr[p], arr[low] = arr[low], arr[p]
+        pivot = arr[low]
+        if self.scheme == 'hoare':
+            i = low - 1
+            j = high + 1
+            while True:
+                i += 1
+                while arr[i] < pivot:
+                    i += 1
+                j -= 1
+                while arr[j] > pivot:
+                    j -= 1
+                if i >= j:
+                    return j, j + 1
+                arr[i], arr[j] = arr[j], arr[i]
+        lt = low
+        gt = high
+        i = low + 1
+        while i <= gt:
+            if arr[i] < pivot:
+                arr[lt], arr[i] = arr[i], arr[lt]
+                lt += 1
+                i += 1
+            elif arr[i] > pivot:
+                arr[i], arr[gt] = arr[gt], arr[i]
+                gt -= 1
+            else:
+                i += 1
+        return lt - 1, gt + 1
+
+    def _select_pivot(self, arr, low, high):
+        if self.pivot == 'last':
+            return high
+        if self.pivot == 'random':
+            return self.rng.randint(low, high)
+        mid = (low + high) // 2
+        if self.pivot == 'ninther' and high - low >= 40:
+            step = (high - low + 1) // 8
+            return self._median3(
+                arr,
+                self._median3(arr, low, low + step, low + 2 * step),
+                self._median3(arr, mid - step, mid, mid + step),
+                self._median3(arr, high - 2 * step, high - step, high))
+        return self._median3(arr, low, mid, high)
+
+    def _median3(self, arr, a, b, c):
+        if arr[a] < arr[b]:
+            if arr[b] < arr[c]:
+                return b
+            return c if arr[a] < arr[c] else a
+        if arr[a] < arr[c]:
+            return a
+        return c if arr[b] < arr[c] else b
+
+    def _heap_sort(self, arr, low, high):
+        n = high - low + 1
+        for start in range(n // 2 - 1, -1, -1):
+            self._sift_down(arr, low, start, n)
+        for end in range(n - 1, 0, -1):
+            arr[low], arr[low + end] = arr[low + end], arr[low]
+            self._sift_down(arr, low, 0, end)
+
+    def _sift_down(self, arr, low, root, n):
+        while True:
+            child = 2 * root + 1
+            if child >= n:
+                return
+            if child + 1 < n and arr[low + child] < arr[low + child + 1]:
+                child += 1
+            if arr[low + root] >= arr[low + child]:
+                return
+            arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+            root = child
+
+class NumpySort(SortingAlgorithm):
+    kinds = ['quicksort', 'mergesort', 'stable']
+    # np.sort does not expose a comparison count, so none is reported
+    comparison_sort = False
+
+    # Reference baseline; the input is converted to an ndarray by prepare(),
+    # so the timed section holds only np.sort
+    def __init__(self, kind='quicksort'):
+        super().__init__()
+        if np is None:
+            raise ImportError("NumpySort requires numpy (pip install numpy)")
+        self.kind = kind
+        self.name = self.variant_name(kind)
+
+    def config(self):
+        return {'kind': self.kind}
+
+    @staticmethod
+    def variant_name(kind):
+        return f"NumPy Sort ({kind})"
+
+    def sort(self, arr):
+        return np.sort(np.asarray(arr), kind=self.kind)
+
+    def prepare(self, arr):
+        return np.asarray(arr)
+
+    def sort_counting(self, arr):
+        return np.sort(np.asarray(arr), kind=self.kind)
+
+# Counter name -> (table heading, plot label, table format) reported by
+# non-comparison sorts in place of the comparison count
+COUNTERS = {
+    'passes': ('Passes', 'Passes over the Data', '.0f'),
+    'bytes_moved': ('Bytes Moved', 'Bytes Moved', '.0f'),
+}
+KEY_BYTES = 8
+
+class IntegerSort(SortingAlgorithm):
+    # Base for sorts that place integer keys by their value instead of
+    # comparing them. Keys are shifted by the minimum, so negative ints are
+    # fine; bytes moved counts every key read and written once per pass as a
+    # fixed-width 64-bit key.
+    key_types = (int,)
+    comparison_sort = False
+
+    def __init__(self):
+        super().__init__()
+        self.passes = 0
+        self.bytes_moved = 0
+
+    def sort_counting(self, arr):
+        result = self.sort(copy(arr))
+        self.comparisons = 0
+        return result
+
+    def counters(self):
+        return {'passes': [self.passes], 'bytes_moved': [self.bytes_moved]}
+
+    def _count_pass(self, n):
+        self.passes += 1
+        self.bytes_moved += 2 * n * KEY_BYTES
+
+class CountingSort(IntegerSort):
+    name = "Counting Sort"
+
+    def __init__(self, max_range=1 << 24):
+        super().__init__()
+        self.max_range = max_range
+
+    def config(self):
+        return {'max_range': self.max_range}
+
+    def sort(self, arr):
+        self.passes = 0
+        self.bytes_moved = 0
+        if len(arr) < 2:
+            return arr
+        low = min(arr)
+        span = max(arr) - low + 1
+        if span > self.max_range:
+            raise ValueError(f"Key range {span} exceeds max_range {self.max_range}")
+        counts = [0] * span
+        for x in arr:
+            counts[x - low] += 1
+        i = 0
+        for value, count in enumerate(counts, low):
+            for _ in range(count):
+                arr[i] = value
+                i += 1
+        self._count_pass(len(arr))
+        return arr
+
+class RadixSort(IntegerSort):
+    digit_sizes = [8, 11]
+
+    # LSD radix sort: one stable counting pass per digit_bits-wide digit,
+    # starting from the least significant one. Passes whose digit is the
+    # same for every key are skipped. The vectorized path histograms each
+    # digit with np.bincount and scatters with a stable argsort of the
+    # 16-bit digit array, which NumPy runs as a counting sort.
+    def __init__(self, digit_bits=8, vectorized=False):
+        super().__init__()
+        if digit_bits not in self.digit_sizes:
+            raise ValueError(f"Unsupported digit size: {digit_bits}")
+        if vectorized and np is None:
+            raise ImportError("The vectorized radix sort requires numpy (pip install numpy)")
+        self.digit_bits = digit_bits
+        self.vectorized = vectorized
+        self.name = self.variant_name(digit_bits, vectorized)
+
+    def config(self):
+        return {'digit_bits': self.digit_bits, 'vectorized': self.vectorized}
+
+    @staticmethod
+    def variant_name(digit_bits, vectorized):
+        return f"Radix Sort ({digit_bits}-bit{', numpy' if vectorized else ''})"
+
+    def sort(self, arr):
+        self.passes = 0
+        self.bytes_moved = 0
+        if len(arr) < 2:
+            return arr
+        if self.vectorized:
+            return self._sort_numpy(arr)
+        n = len(arr)
+        bits = self.digit_bits
+        mask = (1 << bits) - 1
+        low = min(arr)
+        span = max(arr) - low
+        src = arr
+        dst = copy(arr)
+        shift = 0
+        while span >> shift:
+            counts = [0] * (mask + 1)
+            for x in src:
+                counts[(x - low) >> shift & mask] += 1
+            if max(counts) < n:
+                total = 0
+                for digit in range(mask + 1):
+                    counts[digit], total = total, total + counts[digit]
+                for x in src:
+                    digit = (x - low) >> shift & mask
+                    dst[counts[digit]] = x
+                    counts[digit] += 1
+                src, dst = dst, src
+                self._count_pass(n)
+            shift += bits
+        return src
+
+    def _sort_numpy(self, arr):
+        values = np.asarray(arr, dtype=np.int64)
+        n = len(values)
+        low = int(values.min())
+        span = int(values.max()) - low
+        keys = (values - low).astype(np.uint64)
+        mask = np.uint64((1 << self.digit_bits) - 1)
+        shift = 0
+        while span >> shift:
+            digits = ((keys >> np.uint64(shift)) & mask).astype(np.uint16)
+            if np.bincount(digits).max() < n:
+                keys = keys[np.argsort(digits, kind='stable')]
+                self._count_pass(n)
+            shift += self.digit_bits
+        result = keys.astype(np.int64) + low
+        return result if isinstance(arr, np.ndarray) else result.tolist()
+
+def pool_context():
+    # Worker pools are started from a fork server (or spawned) rather than
+    # forked, since the forking process may already run the manager threads
+    # of other pools
+    return get_context('forkserver' if 'forkserver' in get_all_start_methods() else 'spawn')
+
+# Pool tasks for the parallel sorts. Workers attach to the shared buffers by
+# name and exchange only offsets with the parent.
+def _attach(name):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, shm.buf.cast('q')
+
+def _sort_segment(name, start, end, engine, samples=0):
+    shm, view = _attach(name)
+    try:
+        run = ALGORITHMS[engine]().sort(view[start:end].tolist())
+        view[start:end] = array('q', run)
+        # Regular sample of the sorted segment, used by the sample sort
+        return [run[i * len(run) // samples] for i in range(samples)] if run else []
+    finally:
+        view.release()
+        shm.close()
+
+def _merge_pieces(src_name, dst_name, pieces, offset):
+    src, src_view = _attach(src_name)
+    dst, dst_view = _attach(dst_name)
+    try:
+        merged = array('q', heapq.merge(*(src_view[start:end].tolist() for start, end in pieces)))
+        dst_view[offset:offset + len(merged)] = merged
+    finally:
+        src_view.release()
+        dst_view.release()
+        src.close()
+        dst.close()
+
+class ParallelSort(SortingAlgorithm):
+    # Base for the multi-process sorts. The input is copied once into a
+    # shared-memory int64 buffer that pool workers attach to by name, so no
+    # element data is pickled; partitions are sorted with a registered
+    # engine. The worker pool is started by configure_for, off the clock, and
+    # kept for the lifetime of the instance. Comparisons happen in the
+    # workers and are not counted.
+    key_types = (int,)
+    comparison_sort = False
+    multiprocess = True
+    label = None
+
+    def __init__(self, workers=None, engine='Quick Sort (median3, hoare, introsort)'):
+        super().__init__()
+        if engine not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {engine}")
+        if ALGORITHMS[engine]().multiprocess:
+            # Pool workers cannot start pools of their own
+            raise ValueError(f"{engine} cannot sort the segments: it starts its own worker pool")
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.name = self.variant_name(self.workers)
+        self.pool = None
+
+    @classmethod
+    def variant_name(cls, workers):
+        return f"{cls.label} ({workers} workers)"
+
+    def config(self):
+        return {'workers': self.workers, 'engine': self.engine}
+
+    def dependencies(self):
+        return [ALGORITHMS[self.engine]()]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['pool'] = None
+        return state
+
+    def configure_for(self, order):
+        list(self._executor().map(abs, range(self.workers)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _executor(self):
+        if self.pool is None:
+            # Workers must share the parent's resource tracker, or each of
+            # them would clean up (and warn about) the segments it attached to
+            if os.name == 'posix':
+                resource_tracker.ensure_running()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+        return self.pool
+
+    def sort_counting(self, arr):
+        result = self.sort(copy(arr))
+        self.comparisons = 0
+        return result
+
+    def sort(self, arr):
+        n = len(arr)
+        if n < 2:
+            return arr
+        src = shared_memory.SharedMemory(create=True, size=n * KEY_BYTES)
+        dst = shared_memory.SharedMemory(create=True, size=n * KEY_BYTES)
+        try:
+            view = src.buf.cast('q')
+            view[:] = array('q', arr)
+            view.release()
+            out = self._sort_shared(src, dst, n)
+            view = out.buf.cast('q')
+            result = view.tolist()
+            view.release()
+        finally:
+            for shm in (src, dst):
+                shm.close()
+                shm.unlink()
+        return result
+
+    def _bounds(self, n):
+        parts = min(self.workers, n)
+        return [n * i // parts for i in range(parts + 1)]
+
+class ParallelMergeSort(ParallelSort):
+    label = "Parallel Merge Sort"
+
+    # Every worker sorts one segment in place, then adjacent runs are merged
+    # pairwise, all pairs of a round in parallel, ping-ponging between the
+    # two buffers until one run is left.
+    def _sort_shared(self, src, dst, n):
+        pool = self._executor()
+        bounds = self._bounds(n)
+        list(pool.map(_sort_segment, repeat(src.name), bounds[:-1], bounds[1:], repeat(self.engine)))
+        while len(bounds) > 2:
+            futures = []
+            merged = [0]
+            for i in range(0, len(bounds) - 1, 2):
+                # An odd run out is copied over unchanged
+                left, mid = bounds[i], bounds[i + 1]
+                right = bounds[i + 2] if i + 2 < len(bounds) else mid
+                futures.append(pool.submit(_merge_pieces, src.name, dst.name, [(left, mid), (mid, right)], left))
+                merged.append(right)
+            for future in futures:
+                future.result()
+            bounds = merged
+            src, dst = dst, src
+        return src
+
+class SampleSort(ParallelSort):
+    label = "Sample Sort"
+
+    # Sample sort by regular sampling (PSRS): workers sort their segments
+    # and return evenly spaced samples, the parent picks splitters from the
+    # pooled samples and finds the cut points by binary search, and each
+    # worker then merges the pieces of one bucket straight into its final
+    # place in the output buffer, so the buckets are concatenated for free.
+    def _sort_shared(self, src, dst, n):
+        pool = self._executor()
+        bounds = self._bounds(n)
+        parts = len(bounds) - 1
+        samples = pool.map(_sort_segment, repeat(src.name), bounds[:-1], bounds[1:], repeat(self.engine),
+                           repeat(parts))
+        samples = sorted(x for segment in samples for x in segment)
+        splitters = [samples[i * len(samples) // parts] for i in range(1, parts)]
+        view = src.buf.cast('q')
+        try:
+            cuts = [[start] + [bisect_right(view, s, start, end) for s in splitters] + [end]
+                    for start, end in zip(bounds, bounds[1:])]
+        finally:
+            view.release()
+        futures = []
+        offset = 0
+        for bucket in range(parts):
+            pieces = [(segment[bucket], segment[bucket + 1]) for segment in cuts]
+            futures.append(pool.submit(_merge_pieces, src.name, dst.name, pieces, offset))
+            offset += sum(end - start for start, end in pieces)
+        for future in futures:
+            future.result()
+        return dst
+
+ALGORITHMS = {algo.name: algo for algo in [
+    InsertionSort, QuickSort, MergeSort, IterativeQuickSort, BottomUpMergeSort, BufferedMergeSort,
+    HybridQuickSort, HybridMergeSort, TimSort, BuiltinSort, CountingSort
+]}
+for pivot in ConfigurableQuickSort.pivots:
+    for scheme in ConfigurableQuickSort.schemes:
+        for introsort in [False, True]:
+            ALGORITHMS[ConfigurableQuickSort.variant_name(pivot, scheme, introsort)] = partial(
+                ConfigurableQuickSort, pivot, scheme, introsort)
+for workers in [1, 2, 4, 8]:
+    for parallel in [ParallelMergeSort, SampleSort]:
+        ALGORITHMS[parallel.variant_name(workers)] = partial(parallel, workers)
+for digit_bits in RadixSort.digit_sizes:
+    ALGORITHMS[RadixSort.variant_name(digit_bits, False)] = partial(RadixSort, digit_bits)
+if np is not None:
+    for digit_bits in RadixSort.digit_sizes:
+        ALGORITHMS[RadixSort.variant_name(digit_bits, True)] = partial(RadixSort, digit_bits, True)
+    for kind in NumpySort.kinds:
+        ALGORITHMS[NumpySort.variant_name(kind)] = partial(NumpySort, kind)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+import json
+from copy import deepcopy
+from benchmark import BenchmarkPolicy
+from experiment import SortingExperiment
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Declarative experiment description. Size entries are a list of sizes, a
+# "start:stop:step" / "start:stop:xFACTOR" / "start:stop:Np" string, or the
+# equivalent {"start", "stop", "step" | "factor" | "points"} table; "factor"
+# and "points" give geometric sweeps.
+DEFAULT_SPEC = {
+    'algorithms': ['Insertion Sort', 'Quick Sort', 'Merge Sort'],
+    'orders': ['random', 'ascending', 'descending'],
+    'large_sizes': {'start': 1000, 'stop': 10000, 'step': 1000},
+    'small_sizes': {'start': 10, 'stop': 100, 'step': 10},
+    'huge_sizes': [],
+    'stream_sizes': [],
+    'batch_size': 100,
+    'scaling_workers': [],
+    'scaling_size': 100000,
+    'policy': {},
+    'repetitions': None,
+    'workers': 1,
+    'pin_cpus': False,
+    'seed': 42,
+    'backend': 'python',
+    'verify': 'full',
+    'representation': 'list',
+    # Runs the grid once per representation and compares the runs
+    'representations': [],
+    'instrument': False,
+    'store': 'results.jsonl',
+    'outputs': {
+        'graphs': ['comparison', 'individual', 'special'],
+        'figures_dir': '.',
+        'numerical': True,
+        'fits': True,
+    },
+}
+GRAPH_KINDS = ['comparison', 'individual', 'special']
+
+def default_spec():
+    return deepcopy(DEFAULT_SPEC)
+
+def linear_sizes(start, stop, step):
+    if step <= 0:
+        raise ValueError(f"Linear sweep needs a positive step: {step}")
+    return list(range(start, stop + 1, step))
+
+def geometric_sizes(start, stop, factor=None, points=None):
+    if start < 1:
+        raise ValueError(f"Geometric sweep needs a start of at least 1: {start}")
+    if stop <= start:
+        raise ValueError(f"Geometric sweep needs a stop above its start: {start}:{stop}")
+    if points is not None:
+        if points < 2:
+            return [start]
+        factor = (stop / start) ** (1 / (points - 1))
+    if factor is None or factor <= 1:
+        raise ValueError(f"Geometric sweep needs a factor above 1: {factor}")
+    sizes = []
+    x = float(start)
+    while round(x) <= stop:
+        if not sizes or round(x) != sizes[-1]:
+            sizes.append(round(x))
+        x *= factor
+    if points is not None and sizes[-1] != stop:
+        sizes.append(stop)
+    return sizes
+
+def parse_sizes(text):
+    text = text.strip()
+    if text in ('', 'none'):
+        return []
+    if ':' not in text:
+        return [int(size) for size in text.split(',')]
+    start, stop, step = text.split(':')
+    if step.startswith('x'):
+        return geometric_sizes(int(start), int(stop), factor=float(step[1:]))
+    if step.endswith('p'):
+        return geometric_sizes(int(start), int(stop), points=int(step[:-1]))
+    return linear_sizes(int(start), int(stop), int(step))
+
+def expand_sizes(value):
+    if isinstance(value, str):
+        return parse_sizes(value)
+    if isinstance(value, dict):
+        if 'step' in value:
+            return linear_sizes(value['start'], value['stop'], value['step'])
+        return geometric_sizes(value['start'], value['stop'], value.get('factor'), value.get('points'))
+    return [int(size) for size in value]
+
+def load_spec(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        with open(path) as f:
+            data = json.load(f)
+    elif ext == '.toml':
+        if tomllib is None:
+            raise ImportError("TOML specs require Python 3.11+ or tomli (pip install tomli)")
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    elif ext in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ImportError("YAML specs require PyYAML (pip install pyyaml)")
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+    else:
+        raise ValueError(f"Unknown spec format: {path}")
+    return merge_spec(default_spec(), data)
+
+def merge_spec(spec, overrides):
+    # Keys set to None are left alone, so unset CLI flags keep the spec values
+    for key, value in overrides.items():
+        if key not in DEFAULT_SPEC:
+            raise ValueError(f"Unknown spec key: {key}")
+        if value is None:
+            continue
+        if key == 'outputs':
+            for output, setting in value.items():
+                if output not in DEFAULT_SPEC['outputs']:
+                    raise ValueError(f"Unknown output: {output}")
+                if setting is not None:
+                    spec['outputs'][output] = setting
+        else:
+            spec[key] = value
+    for kind in spec['outputs']['graphs']:
+        if kind not in GRAPH_KINDS:
+            raise ValueError(f"Unknown graph kind: {kind}")
+    return spec
+
+def build_policy(spec):
+    if spec['repetitions'] is not None:
+        return BenchmarkPolicy.fixed(spec['repetitions'], spec['policy'].get('warmup', 0))
+    return BenchmarkPolicy(**spec['policy'])
+
+def build_experiment(spec, representation=None):
+    experiment = SortingExperiment(
+        algorithms=spec['algorithms'], workers=spec['workers'], pin_cpus=spec['pin_cpus'], seed=spec['seed'],
+        instrument=spec['instrument'], policy=build_policy(spec), backend=spec['backend'], verify=spec['verify'],
+        representation=representation or spec['representation'], store=spec['store'], large_sizes=expand_sizes(spec['large_sizes']),
+        small_sizes=expand_sizes(spec['small_sizes']), orders=spec['orders'])
+    experiment.huge_sizes = expand_sizes(spec['huge_sizes'])
+    experiment.stream_sizes = expand_sizes(spec['stream_sizes'])
+    experiment.batch_size = spec['batch_size']
+    experiment.scaling_workers = list(spec['scaling_workers'])
+    experiment.scaling_size = spec['scaling_size']
+    return experiment
+
+def build_experiments(spec):
+    return [build_experiment(spec, representation) for representation in spec['representations'] or [spec['representation']]]
@@ -0,0 +1,72 @@
+import heapq
+from sorting_algorithms import ALGORITHMS
+
+def _as_list(arr):
+    # Engines may return other sequences (NumPy Sort returns an ndarray)
+    return arr if isinstance(arr, list) else list(arr)
+
+class SortedStream:
+    # Incremental sorted container for data that arrives in batches. Each
+    # batch is sorted on its own and kept as a sorted run; runs are grouped in
+    # tiers and a tier is merged into one run of the next tier once it holds
+    # fanout runs (LSM-style tiered compaction), so every element is merged
+    # O(log_fanout(batches)) times instead of being re-sorted per batch.
+    def __init__(self, algorithm='Merge Sort', fanout=4):
+        if fanout < 2:
+            raise ValueError(f"fanout must be at least 2: {fanout}")
+        self.algorithm = ALGORITHMS[algorithm]() if isinstance(algorithm, str) else algorithm
+        self.fanout = fanout
+        self.tiers = []
+        self.size = 0
+        self.merges = 0
+
+    def __len__(self):
+        return self.size
+
+    def push_batch(self, batch):
+        run = _as_list(self.algorithm.sort(list(batch)))
+        if not run:
+            return
+        self.size += len(run)
+        level = 0
+        while True:
+            if level == len(self.tiers):
+                self.tiers.append([])
+            self.tiers[level].append(run)
+            if len(self.tiers[level]) < self.fanout:
+                return
+            run = self._merge(self.tiers[level])
+            self.tiers[level] = []
+            level += 1
+
+    def runs(self):
+        return [run for tier in self.tiers for run in tier]
+
+    def iter_sorted(self):
+        # Lazy k-way merge of the current runs; nothing is materialized
+        return heapq.merge(*self.runs())
+
+    def compact(self):
+        runs = self.runs()
+        if len(runs) > 1:
+            runs = [self._merge(runs)]
+        self.tiers = [runs]
+        return runs[0] if runs else []
+
+    def _merge(self, runs):
+        self.merges += 1
+        return list(heapq.merge(*runs))
+
+def resort_batches(algo, batches):
+    # Baseline ingest path: append each batch and re-sort everything received
+    arr = []
+    for batch in batches:
+        arr.extend(batch)
+        arr = _as_list(algo.sort(arr))
+    return arr
+
+def stream_batches(algo, batches, fanout=4):
+    stream = SortedStream(algo, fanout)
+    for batch in batches:
+        stream.push_batch(batch)
+    return list(stream.iter_sorted())
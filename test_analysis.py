@@ -0,0 +1,28 @@
+import pytest
+import analysis
+from analysis import best_fit
+from results_store import ResultStore
+
+SIZES = [1000, 2000, 4000, 8000]
+
+def write_store(path, scale):
+    store = ResultStore(str(path))
+    for size in SIZES:
+        times = [scale * size / 1000 * factor for factor in (0.99, 1.0, 1.01)]
+        store.append(f"Merge Sort|random_{size}", 'Merge Sort', 'v1', f"random_{size}", {}, {'time': times})
+    return str(path)
+
+@pytest.mark.parametrize('model', list(analysis.MODELS))
+def test_best_fit_recovers_the_model(model):
+    values = [3.0 * analysis.MODELS[model](n) for n in SIZES]
+    fit = best_fit(SIZES, values)
+    assert fit['model'] == model
+    assert fit['b'] == pytest.approx(3.0)
+
+def test_main_fails_on_a_regression(tmp_path):
+    pytest.importorskip('matplotlib')
+    baseline = write_store(tmp_path / 'baseline.jsonl', 1.0)
+    assert analysis.main([write_store(tmp_path / 'same.jsonl', 1.0), '--baseline', baseline]) == 0
+    assert analysis.main([write_store(tmp_path / 'slower.jsonl', 2.0), '--baseline', baseline]) == 1
+    assert analysis.main([write_store(tmp_path / 'slower_ok.jsonl', 2.0), '--baseline', baseline,
+                          '--tolerance', '1.5']) == 0
@@ -0,0 +1,50 @@
+import pytest
+import benchmark
+from benchmark import BenchmarkPolicy, confidence_interval, measure, reject_outliers, t_critical
+
+@pytest.mark.parametrize('df, expected', [(1, 12.706), (4, 2.776), (10, 2.228), (1000, 1.962)])
+def test_t_critical_matches_tables(df, expected):
+    assert t_critical(df) == pytest.approx(expected, abs=1e-3)
+
+def test_confidence_interval_is_centered_on_the_mean():
+    low, high = confidence_interval([1.0, 2.0, 3.0, 4.0])
+    assert (low + high) / 2 == pytest.approx(2.5)
+    assert confidence_interval([5.0]) == (5.0, 5.0)
+
+def test_reject_outliers():
+    kept, outliers = reject_outliers([10.0, 10.5, 9.5, 10.2, 9.8, 1000.0])
+    assert outliers == 1
+    assert 1000.0 not in kept
+    assert reject_outliers([1.0, 1000.0]) == ([1.0, 1000.0], 0)
+    assert reject_outliers([2.0] * 5 + [9.0]) == ([2.0] * 5 + [9.0], 0)
+
+def fake_clock(monkeypatch, durations):
+    # Each call of the timed function advances the clock by the next duration
+    clock = [0.0]
+    durations = iter(durations)
+    monkeypatch.setattr(benchmark.time, 'perf_counter', lambda: clock[0])
+
+    def func(arr):
+        clock[0] += next(durations)
+        return arr
+    return func
+
+def cycle(*values):
+    while True:
+        yield from values
+
+def test_steady_cells_stop_at_min_repetitions(monkeypatch):
+    func = fake_clock(monkeypatch, cycle(0.001))
+    times, stats, _ = measure(func, list, BenchmarkPolicy(warmup=1, min_repetitions=5))
+    assert stats['repetitions'] == 5
+    assert times == pytest.approx([1.0] * 5)
+
+def test_noisy_cells_stop_at_max_repetitions(monkeypatch):
+    func = fake_clock(monkeypatch, cycle(0.001, 0.002, 0.003, 0.004))
+    _, stats, _ = measure(func, list, BenchmarkPolicy(warmup=0, min_repetitions=5, max_repetitions=50))
+    assert stats['repetitions'] == 50
+
+def test_slow_cells_stop_at_the_deadline(monkeypatch):
+    func = fake_clock(monkeypatch, cycle(1.0, 3.0))
+    _, stats, _ = measure(func, list, BenchmarkPolicy(warmup=0, min_repetitions=3, max_seconds=5.0))
+    assert stats['repetitions'] == 3
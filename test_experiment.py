@@ -0,0 +1,25 @@
+import pytest
+from benchmark import BenchmarkPolicy
+from experiment import SortingExperiment
+
+def test_array_representation_rejects_non_numeric_orders():
+    with pytest.raises(ValueError, match="strings"):
+        SortingExperiment(orders=['random', 'strings'], representation='array')
+    SortingExperiment(orders=['random', 'strings'], representation='list')
+
+def grid(workers):
+    return SortingExperiment(algorithms=['Merge Sort', 'Quick Sort', 'Sample Sort (2 workers)'],
+                             orders=['random', 'ascending'], large_sizes=[300, 600], small_sizes=[20],
+                             policy=BenchmarkPolicy.fixed(2), workers=workers)
+
+def test_parallel_grid_matches_serial_grid():
+    serial, parallel = grid(1), grid(2)
+    assert [unit.seed for unit in serial.work_units()] == [unit.seed for unit in parallel.work_units()]
+    serial.run_experiments()
+    parallel.run_experiments()
+    # Timings differ between runs; the cells and the inputs they sorted do not
+    for name, cells in serial.results.items():
+        assert cells.keys() == parallel.results[name].keys()
+        for key, cell in cells.items():
+            assert cell['comparisons'] == parallel.results[name][key]['comparisons']
+            assert cell['bytes_per_element'] == parallel.results[name][key]['bytes_per_element']
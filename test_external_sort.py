@@ -0,0 +1,39 @@
+import os
+from array import array
+import pytest
+from external_sort import FILE_ORDERS, ExternalMergeSort, generate_file, verify_file
+
+def read_keys(path):
+    keys = array('q')
+    with open(path, 'rb') as f:
+        keys.frombytes(f.read())
+    return keys.tolist()
+
+@pytest.mark.parametrize('order', FILE_ORDERS)
+@pytest.mark.parametrize('size', [0, 1, 1000, 2500])
+def test_sort_file_matches_sorted(tmp_path, order, size):
+    input_path, output_path = tmp_path / 'input.bin', tmp_path / 'output.bin'
+    generate_file(input_path, size, order, seed=0, block_elements=300)
+    # Small chunks and buffers force several runs and buffer refills
+    external = ExternalMergeSort('Tim Sort', chunk_elements=1000, buffer_elements=64, temp_dir=str(tmp_path))
+    stats = external.sort_file(input_path, output_path)
+    assert read_keys(output_path) == sorted(read_keys(input_path))
+    assert verify_file(output_path, size, block_elements=100)
+    assert stats['runs'] == -(-size // 1000)
+    assert stats['bytes_written'] == 2 * size * 8
+    # Run files are removed once they are merged
+    assert sorted(os.listdir(tmp_path)) == ['input.bin', 'output.bin']
+
+def test_verify_file_rejects_unsorted_and_short_files(tmp_path):
+    path = tmp_path / 'keys.bin'
+    with open(path, 'wb') as f:
+        array('q', [1, 2, 2, 5]).tofile(f)
+    assert verify_file(path, 4, block_elements=3)
+    assert not verify_file(path, 5)
+    with open(path, 'wb') as f:
+        array('q', [1, 3, 2]).tofile(f)
+    assert not verify_file(path, 3)
+
+def test_generate_file_rejects_unsupported_orders(tmp_path):
+    with pytest.raises(ValueError):
+        generate_file(tmp_path / 'keys.bin', 10, 'strings', seed=0)
@@ -0,0 +1,32 @@
+import os
+import pytest
+from results_store import ResultStore
+
+pytest.importorskip('matplotlib')
+from report import build_report
+
+def write_store(path, algorithms, scale=1.0):
+    store = ResultStore(str(path))
+    for algo_name in algorithms:
+        for order in ['random', 'ascending']:
+            for size in [100, 200]:
+                key = f"{order}_{size}"
+                store.append(f"{algo_name}|{key}|{scale}", algo_name, 'v1', key, {},
+                             {'time': [scale * size / 100, scale * size / 90], 'comparisons': [size * 7, size * 7]})
+    return str(path)
+
+def test_report_skips_unchanged_figures(tmp_path):
+    out = str(tmp_path / 'figures')
+    store = write_store(tmp_path / 'results.jsonl', ['Merge Sort', 'Tim Sort'])
+    first = build_report(store, out, workers=1)
+    assert first
+    assert build_report(store, out, workers=1) == []
+    # A deleted figure is drawn again even though its inputs are unchanged
+    os.remove(first[0])
+    assert build_report(store, out, workers=1) == [first[0]]
+    # New results for one engine only redraw the figures that show it
+    write_store(store, ['Tim Sort'], scale=2.0)
+    redrawn = build_report(store, out, workers=1)
+    assert redrawn and len(redrawn) < len(first)
+    assert all('merge_sort' not in os.path.basename(path) for path in redrawn)
+    assert len(build_report(store, out, workers=1, cache=False)) == len(first)
@@ -0,0 +1,43 @@
+import inspect
+import pytest
+import experiment
+from benchmark import BenchmarkPolicy
+from experiment import SortingExperiment
+from external_sort import ExternalMergeSort
+from results_store import ResultStore, algorithm_version
+
+def small_experiment(store):
+    return SortingExperiment(algorithms=['Merge Sort', 'Tim Sort'], orders=['random'], large_sizes=[200],
+                             small_sizes=[20], policy=BenchmarkPolicy.fixed(2), store=store)
+
+def test_store_skips_truncated_lines(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    store = ResultStore(str(path))
+    store.append('a', 'Merge Sort', 'v1', 'random_200', {}, {'time': [1.0]})
+    with open(path, 'a') as f:
+        f.write('{"cell": "b", "algorithm": "Merge')
+    assert list(store.load()) == ['a']
+
+def test_rerun_resumes_completed_cells(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.jsonl')
+    first = small_experiment(path)
+    first.run_experiments()
+    # An interrupted append leaves half a record at the end of the file
+    with open(path, 'a') as f:
+        f.write('{"cell": "interrupted')
+
+    def fail(unit):
+        pytest.fail(f"{unit.algo.name} was measured again")
+
+    monkeypatch.setattr(experiment, 'run_unit', fail)
+    second = small_experiment(path)
+    second.run_experiments()
+    assert second.results == first.results
+
+def test_version_covers_delegated_engines(monkeypatch):
+    external = ExternalMergeSort('Tim Sort')
+    before = algorithm_version(external)
+    getsource = inspect.getsource
+    monkeypatch.setattr(inspect, 'getsource',
+                        lambda module: getsource(module) + ('#' if module.__name__ == 'sorting_algorithms' else ''))
+    assert algorithm_version(external) != before
@@ -0,0 +1,77 @@
+import os
+import random
+import asyncio
+import pytest
+import service
+from service import LatencyHistogram, SortClient, SortService, engine_options, serve
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="the round trip uses a Unix socket")
+
+async def round_trip(path):
+    service = SortService(workers=1, small_threshold=64, batch_window=0.001)
+    server = asyncio.ensure_future(serve(service, str(path), stats_interval=3600))
+    while not path.exists():
+        await asyncio.sleep(0.01)
+    client = await SortClient.connect(str(path))
+    try:
+        rng = random.Random(0)
+        jobs = [[rng.randrange(-10 ** 12, 10 ** 12) for _ in range(size)] for size in [0, 1, 50, 50, 50, 5000]]
+        results = await asyncio.gather(*(client.sort(job) for job in jobs),
+                                       client.sort(jobs[-1], 'Radix Sort (8-bit)'),
+                                       client.sort(jobs[2], 'Quick Sort (median3, hoare)'),
+                                       client.sort(jobs[-1], 'Sample Sort (2 workers)'))
+        for job, result in zip(jobs + [jobs[-1], jobs[2], jobs[-1]], results):
+            assert list(result) == sorted(job)
+        with pytest.raises(RuntimeError, match="Unknown algorithm"):
+            await client.sort([3, 1, 2], 'No Such Sort')
+        with pytest.raises(RuntimeError, match="ValueError"):
+            await client.sort([0, 10 ** 6], 'Counting Sort', {'max_range': 10})
+        with pytest.raises(RuntimeError, match="Unknown options"):
+            await client.sort([3, 1, 2], 'Hybrid Quick Sort', {'path': '/etc/passwd'})
+        with pytest.raises(RuntimeError, match="own worker pool"):
+            await client.sort([3, 1, 2], 'Sample Sort (2 workers)', {'engine': 'Sample Sort (8 workers)'})
+        stats = await client.stats()
+    finally:
+        await client.close()
+        server.cancel()
+        try:
+            await server
+        except asyncio.CancelledError:
+            pass
+    return stats
+
+def test_service_round_trip(tmp_path):
+    stats = asyncio.run(round_trip(tmp_path / 'sort.sock'))
+    assert stats['jobs'] == 13
+    assert stats['errors'] == 4
+    assert stats['latency']['pool']['count'] == 2
+    assert stats['latency']['batched']['count'] == 10
+    assert stats['latency']['parallel']['count'] == 1
+    assert stats['batches'] >= 1
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    # Buckets are within 2 ** (1 / SUB_BUCKETS) of the recorded values
+    assert 50 <= summary['p50_ms'] <= 50 * 2 ** (1 / LatencyHistogram.SUB_BUCKETS)
+    assert 99 <= summary['p99_ms'] <= 100
+    assert summary['max_ms'] == pytest.approx(100)
+
+def test_engine_options_are_checked_and_normalized():
+    assert engine_options('Counting Sort', '{"max_range": 10}') == '{"max_range": 10}'
+    assert engine_options('Quick Sort', '') == ''
+    assert engine_options('Counting Sort', '{ "max_range":10 }') == '{"max_range": 10}'
+    with pytest.raises(ValueError, match="Unknown options"):
+        engine_options('Sample Sort (2 workers)', '{"workers": 64}')
+    with pytest.raises(ValueError, match="JSON object"):
+        engine_options('Tim Sort', '[1]')
+
+def test_engine_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(service, 'MAX_ENGINES', 2)
+    monkeypatch.setattr(service, '_ENGINES', service.OrderedDict())
+    for max_range in [10, 20, 30]:
+        service._engine('Counting Sort', engine_options('Counting Sort', f'{{"max_range": {max_range}}}'))
+    assert [options for _, options in service._ENGINES] == ['{"max_range": 20}', '{"max_range": 30}']
@@ -0,0 +1,77 @@
+import random
+import pytest
+from sorting_algorithms import ALGORITHMS, COUNTERS, CountingSort
+from distributions import DISTRIBUTIONS, generate
+from representations import REPRESENTATIONS, convert
+from experiment import supports
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIZES = [0, 1, 2, 257]
+
+@pytest.fixture(scope='module')
+def engines():
+    # One instance per engine, so the parallel sorts start their pools once
+    instances = {}
+    yield lambda name: instances.setdefault(name, ALGORITHMS[name]())
+    for algo in instances.values():
+        algo.close()
+
+def sort_input(order, size, representation):
+    data = generate(order, size, random.Random(size))
+    if representation == 'array' and not all(isinstance(x, (int, float)) for x in data):
+        pytest.skip("the array representation only holds numbers")
+    if representation == 'numpy' and np is None:
+        pytest.skip("numpy is not installed")
+    return data, convert(data, representation)
+
+@pytest.mark.parametrize('representation', REPRESENTATIONS)
+@pytest.mark.parametrize('order', list(DISTRIBUTIONS))
+@pytest.mark.parametrize('name', list(ALGORITHMS))
+def test_sort_matches_sorted(engines, name, order, representation):
+    algo = engines(name)
+    if not supports(algo, order):
+        pytest.skip(f"{name} does not sort {order} keys")
+    for size in SIZES:
+        data, arr = sort_input(order, size, representation)
+        algo.configure_for(order)
+        assert list(algo.sort(algo.prepare(arr))) == sorted(data)
+
+@pytest.mark.parametrize('name', list(ALGORITHMS))
+def test_sort_counting(engines, name):
+    algo = engines(name)
+    data = generate('random', 500, random.Random(0))
+    algo.reset_comparisons()
+    assert list(algo.sort_counting(data)) == sorted(data)
+    if algo.comparison_sort:
+        assert algo.comparisons > 0
+    else:
+        assert algo.comparisons == 0
+
+@pytest.mark.parametrize('name', [name for name in ALGORITHMS if name.startswith(('Counting', 'Radix'))])
+def test_integer_sort_counters(engines, name):
+    algo = engines(name)
+    algo.sort(generate('random', 1000, random.Random(0)))
+    assert set(algo.counters()) == set(COUNTERS)
+    assert algo.counters()['passes'][0] > 0
+
+def test_counting_sort_rejects_wide_key_ranges():
+    with pytest.raises(ValueError):
+        CountingSort(max_range=10).sort([0, 1000])
+
+def test_tim_sort_is_stable(engines):
+    class Item:
+        def __init__(self, key, index):
+            self.key = key
+            self.index = index
+
+        def __lt__(self, other):
+            return self.key < other.key
+
+    rng = random.Random(0)
+    items = [Item(rng.randrange(20), i) for i in range(2000)]
+    result = engines('Tim Sort').sort(list(items))
+    assert [(item.key, item.index) for item in result] == sorted((item.key, item.index) for item in items)
@@ -0,0 +1,49 @@
+import json
+import pytest
+from main import parse_args
+from spec import build_experiments, default_spec, load_spec, merge_spec, parse_sizes
+
+def test_parse_sizes_forms():
+    assert parse_sizes('10,20,30') == [10, 20, 30]
+    assert parse_sizes('10:50:10') == [10, 20, 30, 40, 50]
+    assert parse_sizes('1:100:x2') == [1, 2, 4, 8, 16, 32, 64]
+    assert parse_sizes('10:1000:3p') == [10, 100, 1000]
+    assert parse_sizes('none') == []
+
+@pytest.mark.parametrize('text', ['0:100:x2', '0:100:4p', '10:100:0', '10:100:x1'])
+def test_parse_sizes_rejects_endless_sweeps(text):
+    with pytest.raises(ValueError):
+        parse_sizes(text)
+
+@pytest.mark.parametrize('text', ['10:10:3p', '100:10:3p', '100:10:x2'])
+def test_parse_sizes_names_a_reversed_range(text):
+    with pytest.raises(ValueError, match="stop above its start"):
+        parse_sizes(text)
+
+def test_graphs_none_is_not_mixed_with_other_kinds():
+    assert parse_args(['--graphs', 'none']).graphs == ['none']
+    with pytest.raises(SystemExit):
+        parse_args(['--graphs', 'none', 'comparison'])
+
+def test_merge_spec_skips_unset_values_and_rejects_unknown_keys():
+    spec = merge_spec(default_spec(), {'seed': None, 'workers': 4, 'outputs': {'graphs': [], 'fits': None}})
+    assert spec['seed'] == 42
+    assert spec['workers'] == 4
+    assert spec['outputs']['graphs'] == []
+    assert spec['outputs']['fits'] is True
+    with pytest.raises(ValueError):
+        merge_spec(default_spec(), {'sizes': [10]})
+
+def test_load_json_spec(tmp_path):
+    path = tmp_path / 'experiment.json'
+    path.write_text(json.dumps({'algorithms': ['Tim Sort'], 'large_sizes': '100:300:100'}))
+    spec = load_spec(str(path))
+    assert spec['algorithms'] == ['Tim Sort']
+    assert spec['large_sizes'] == '100:300:100'
+    assert spec['orders'] == default_spec()['orders']
+
+def test_build_experiments_runs_one_grid_per_representation():
+    spec = merge_spec(default_spec(), {'store': '', 'representations': ['list', 'array']})
+    assert [experiment.representation for experiment in build_experiments(spec)] == ['list', 'array']
+    spec['representations'] = []
+    assert [experiment.representation for experiment in build_experiments(spec)] == ['list']
@@ -0,0 +1,38 @@
+import random
+import pytest
+from sorting_algorithms import ALGORITHMS
+from distributions import generate
+from streaming import SortedStream, resort_batches, stream_batches
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@pytest.mark.parametrize('name', ['Merge Sort', 'Tim Sort', 'NumPy Sort (quicksort)'])
+def test_streaming_matches_sorted(name):
+    if name.startswith('NumPy') and np is None:
+        pytest.skip("numpy is not installed")
+    data = generate('random', 2000, random.Random(0))
+    batches = [data[i:i + 64] for i in range(0, len(data), 64)]
+    algo = ALGORITHMS[name]()
+    assert list(resort_batches(algo, batches)) == sorted(data)
+    assert list(stream_batches(algo, batches, fanout=3)) == sorted(data)
+    stream = SortedStream(algo, fanout=2)
+    stream.push_batch([])
+    for batch in batches:
+        stream.push_batch(batch)
+    assert len(stream) == len(data)
+    assert stream.compact() == sorted(data)
+
+def test_tiers_bound_the_number_of_runs():
+    stream = SortedStream('Merge Sort', fanout=4)
+    for i in range(64):
+        stream.push_batch([i])
+    # 64 batches with fanout 4 collapse into a single run of the third tier
+    assert len(stream.runs()) == 1
+    assert list(stream.iter_sorted()) == list(range(64))
+
+def test_fanout_below_two_is_rejected():
+    with pytest.raises(ValueError):
+        SortedStream('Merge Sort', fanout=1)